@@ -3,9 +3,9 @@ agent.py — Car Market Analyst Agent
 Uses OpenAI GPT-4o-mini with tool-calling to analyse a car query and return
 a structured BUY / WAIT / NEUTRAL recommendation with a plain-English explanation.
 
-Tools (called by the LLM in order):
+Tools (called by the LLM in three rounds — 1–4 together, then 5, then 6):
   1. get_price_history        → MongoDB price_snapshots time series
-  2. run_forecast             → Prophet 30 / 90-day price forecast
+  2. run_forecast             → Trend + seasonality 30 / 90-day price forecast
   3. run_price_prediction     → XGBoost inference + top-3 SHAP factors
   4. get_market_context       → Inventory count, trend, regional range
   5. run_llm_price_analysis   → GPT-4o-mini enhanced 30/90-day forecast (blends
@@ -15,97 +15,259 @@ Tools (called by the LLM in order):
 Environment variables required (.env):
   OPENAI_API_KEY
   MONGO_URI
+
+Optional:
+  OPENAI_CONCURRENCY — max in-flight OpenAI requests per process (default 20)
+  USE_PROPHET        — fit Facebook Prophet in run_forecast (36+ months of history)
+  REDIS_URI          — share cached per-vehicle tool results across processes
+  PREDICT_BATCH_WINDOW_MS — coalesce concurrent XGBoost predictions (e.g. 10)
 """
 
 from __future__ import annotations
 
-import json
+import atexit
+import hashlib
 import os
 import sys
+import threading
 import warnings
 warnings.filterwarnings("ignore")          # suppress XGBoost GPU/CPU device warnings
-from datetime import datetime, timezone, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterator
 
+import httpx
 import numpy as np
+import orjson
 import pandas as pd
 from dotenv import load_dotenv
 from openai import OpenAI
-from pymongo import MongoClient
+from pymongo import ASCENDING, DESCENDING, MongoClient
+from pymongo.database import Database
+from pymongo.errors import PyMongoError
 
 # ── Project imports ───────────────────────────────────────────────────────────
 _ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(_ROOT))
-from scripts.model_utils import predict_price, explain_prediction
+from scripts.model_utils import predict_and_explain, warmup as _warmup_model
+from backend.utils.batching import MicroBatcher
+from backend.utils.cache import TTLCache, ttl_cache
+from backend.utils.forecasting import blend_forecasts, extrapolate, ols_seasonal_forecast
 
 # ── Bootstrap ─────────────────────────────────────────────────────────────────
 load_dotenv(_ROOT / ".env")
 
-_oai = OpenAI(api_key=os.environ["OPENAI_API_KEY"])
-_db  = MongoClient(os.environ["MONGO_URI"])["carmarket"]
+# One keep-alive connection pool shared by every OpenAI call in the process
+# (agent tools and the agents package), plus a cap on in-flight requests so
+# concurrent pipelines stay inside the account's rate limit.
+_http = httpx.Client(
+    limits=httpx.Limits(max_keepalive_connections=50, max_connections=100),
+    timeout=httpx.Timeout(30.0, connect=5.0),
+)
+atexit.register(_http.close)
+_oai       = OpenAI(api_key=os.environ["OPENAI_API_KEY"], http_client=_http)
+_oai_slots = threading.BoundedSemaphore(int(os.getenv("OPENAI_CONCURRENCY", "20")))
+
+# MongoClient is not fork-safe, so each process (e.g. each uvicorn/gunicorn
+# worker) lazily opens its own pool on first use instead of at import time.
+_db_by_pid: dict[int, Database] = {}
+_db_lock = threading.Lock()
+
+# Leaf Mongo queries overlapped within a single tool.  Tasks here never wait
+# on other tasks, so it is safe to submit to from any thread, including
+# run_agent's tool workers.
+_IO_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="mongo-io")
+
+
+def get_db() -> Database:
+    """Return this process's ``carmarket`` database handle, connecting on first use."""
+    pid = os.getpid()
+    db  = _db_by_pid.get(pid)
+    if db is None:
+        with _db_lock:
+            db = _db_by_pid.get(pid)
+            if db is None:
+                db = MongoClient(
+                    os.environ["MONGO_URI"],
+                    maxPoolSize=50,
+                    minPoolSize=10,
+                    # Fail fast on an unreachable cluster instead of the 30 s default.
+                    serverSelectionTimeoutMS=2000,
+                    socketTimeoutMS=5000,
+                    # Drivers skip any compressor whose library isn't installed
+                    compressors="zstd,snappy,zlib",
+                )["carmarket"]
+                _db_by_pid[pid] = db
+                # Off the request path so a slow cluster doesn't stall the caller.
+                threading.Thread(
+                    target=_ensure_indexes, args=(db,), name="ensure-indexes", daemon=True,
+                ).start()
+    return db
+
+
+def chat_completion(**kwargs: Any):
+    """``chat.completions.create`` on the shared client, bounded by OPENAI_CONCURRENCY."""
+    with _oai_slots:
+        return _oai.chat.completions.create(**kwargs)
+
+
+def _ensure_indexes(db: Database) -> None:
+    """Create the indexes the tool queries rely on (idempotent).
+
+    The price_snapshots index carries every projected field so
+    get_price_history is a covered query (no document fetch), and the
+    year_month/avg_price index serves the market-wide fallback.
+    """
+    try:
+        db["price_snapshots"].create_index(
+            [("make", ASCENDING), ("model", ASCENDING), ("year", ASCENDING),
+             ("year_month", ASCENDING), ("avg_price", ASCENDING),
+             ("median_price", ASCENDING), ("listing_count", ASCENDING)],
+            name="make_model_year_month_covering",
+        )
+        db["price_snapshots"].create_index(
+            [("year_month", DESCENDING), ("avg_price", ASCENDING)],
+            name="year_month_avg_price",
+        )
+        db["listings"].create_index(
+            [("make", ASCENDING), ("model", ASCENDING), ("year", ASCENDING)],
+            name="make_model_year",
+        )
+    except PyMongoError as exc:
+        print(f"[agent] Index setup skipped: {exc}")
 
 MODEL = "gpt-4o-mini"
 
+# Prophet is opt-in: the closed-form fit in backend.utils.forecasting gives
+# comparable 30/90-day point forecasts on short monthly series in microseconds.
+_USE_PROPHET = bool(os.getenv("USE_PROPHET"))
+# Even then, shorter series don't give Prophet enough to beat the OLS fit.
+_PROPHET_MIN_POINTS = 36
+
+# Per-vehicle tool results (Mongo reads, forecast fits) are stable for far
+# longer than a session, so they are memoised in-process for an hour.
+_CACHE_MAXSIZE = 4096
+_CACHE_TTL_S   = 3600
+
+
+def _vehicle_key(make: str, model: str, year: int) -> tuple:
+    return (make.lower(), model.lower(), year)
+
+# run_forecast reads get_price_history itself; the two share one Mongo read
+# when called in the same turn because ttl_cache single-flights per key.
 SYSTEM_PROMPT = (
-    "You are a car market analyst. When given a car query, call these tools IN ORDER:\n"
-    "1. get_price_history  → fetch historical price data from MongoDB\n"
-    "2. run_forecast       → get statistical 30/90-day price forecast\n"
-    "3. run_price_prediction → get XGBoost fair market value and SHAP factors\n"
-    "4. get_market_context → get inventory count and market position\n"
-    "5. run_llm_price_analysis → pass current_price from step 3, "
-    "stat_forecast_30d/90d from step 2, trend info from steps 2+4 to get enhanced AI forecast\n"
-    "6. synthesize_recommendation → pass ALL data including llm_forecast_30d/90d "
-    "from step 5 to generate the final BUY/WAIT/NEUTRAL signal\n"
+    "You are a car market analyst. When given a car query, call the tools in exactly three turns:\n"
+    "Turn 1 — call these four tools together in ONE response (they only need make/model/year "
+    "and the listing details):\n"
+    "  get_price_history    → historical price data from MongoDB\n"
+    "  run_forecast         → statistical 30/90-day price forecast\n"
+    "  run_price_prediction → XGBoost fair market value and SHAP factors\n"
+    "  get_market_context   → inventory count and market position\n"
+    "Turn 2 — run_llm_price_analysis: pass current_price from run_price_prediction, "
+    "stat_forecast_30d/90d and trend info from run_forecast, and inventory/price position "
+    "from get_market_context to get the enhanced AI forecast\n"
+    "Turn 3 — synthesize_recommendation: pass ALL data including llm_forecast_30d/90d "
+    "from turn 2 to generate the final BUY/WAIT/NEUTRAL signal\n"
     "Then write a 3-sentence plain English explanation citing specific $ numbers. "
     "Be direct. Do not hedge excessively."
 )
 
 
+_MONTHS = (
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December",
+)
+
+
+def _current_month() -> str:
+    return _MONTHS[datetime.now(timezone.utc).month - 1]
+
+
+# get_price_history returns at most this many of a vehicle's most recent
+# snapshots — enough for the seasonal fit and Prophet's 36-month minimum.
+# Counted back from the newest snapshot, not the clock: the data is a fixed
+# 2021 extract.
+_HISTORY_MONTHS = 60
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # Tool implementations
 # ══════════════════════════════════════════════════════════════════════════════
 
+# Results that mean "no data yet" are never cached, so newly ingested
+# snapshots are picked up on the next request instead of after the TTL.
+_FALLBACK_METHODS = frozenset({"industry_default", "market_avg"})
+
+
+def _has_history(rows: list[dict]) -> bool:
+    """False for get_price_history's "no history" sentinel."""
+    return bool(rows) and "error" not in rows[0]
+
+
+def _data_backed(forecast: dict) -> bool:
+    """False for forecasts built from fallbacks rather than this car's data."""
+    return forecast.get("method") not in _FALLBACK_METHODS
+
+
+@ttl_cache(_CACHE_MAXSIZE, _CACHE_TTL_S, key=_vehicle_key, shared=True, should_cache=_has_history)
 def get_price_history(make: str, model: str, year: int) -> list[dict]:
-    """Query MongoDB price_snapshots for (make, model, year) time series."""
-    cursor = _db["price_snapshots"].find(
-        {"make": make.lower(), "model": model.lower(), "year": year},
-        {"_id": 0, "year_month": 1, "avg_price": 1, "median_price": 1, "listing_count": 1},
-    ).sort("year_month", 1)
-
-    history = [
-        {
-            "date":          doc["year_month"],
-            "avg_price":     round(doc.get("avg_price", 0), 2),
-            "median_price":  round(doc.get("median_price", 0), 2),
-            "listing_count": doc.get("listing_count", 0),
-        }
-        for doc in cursor
-    ]
+    """Query MongoDB price_snapshots for the newest 60 months of the (make, model, year) time series."""
+    # Rounding and defaults happen server-side; rows arrive in response shape.
+    history = list(get_db()["price_snapshots"].aggregate([
+        {"$match": {"make": make.lower(), "model": model.lower(), "year": year}},
+        {"$sort": {"year_month": -1}},
+        {"$limit": _HISTORY_MONTHS},
+        {"$sort": {"year_month": 1}},
+        {"$project": {
+            "_id":           0,
+            "date":          "$year_month",
+            "avg_price":     {"$round": [{"$ifNull": ["$avg_price", 0]}, 2]},
+            "median_price":  {"$round": [{"$ifNull": ["$median_price", 0]}, 2]},
+            "listing_count": {"$ifNull": ["$listing_count", 0]},
+        }},
+    ], batchSize=1000))   # whole series in the first batch — no getMore round trips
     return history if history else [{"error": f"No price history for {year} {make} {model}"}]
 
 
+@ttl_cache(1, _CACHE_TTL_S, should_cache=lambda fc: fc["method"] != "industry_default")
 def _market_trend_forecast() -> dict:
     """
     Fallback: derive a forecast from the most recent global price_snapshots
     (all makes/models combined).  Used when a specific car has no history.
     Falls back to US used-car industry averages when DB has no data.
+
+    The month-over-month rate is computed server-side from the two most
+    recent snapshots, and the result is a global metric cached for an hour.
     """
-    recent = list(
-        _db["price_snapshots"]
-        .find({}, {"_id": 0, "year_month": 1, "avg_price": 1})
-        .sort("year_month", -1)
-        .limit(3)
-    )
+    recent = next(get_db()["price_snapshots"].aggregate([
+        {"$sort": {"year_month": -1}},
+        {"$limit": 2},
+        {"$group": {"_id": None, "prices": {"$push": "$avg_price"}}},
+        {"$project": {
+            "_id":  0,
+            "last": {"$arrayElemAt": ["$prices", 0]},
+            "mom":  {"$let": {
+                "vars": {"last": {"$arrayElemAt": ["$prices", 0]},
+                         "prev": {"$arrayElemAt": ["$prices", 1]}},
+                "in": {"$cond": [
+                    {"$gt": ["$$prev", 0]},
+                    {"$divide": [{"$subtract": ["$$last", "$$prev"]}, "$$prev"]},
+                    0.003,
+                ]},
+            }},
+        }},
+    ]), None)
 
     # Industry default when DB has no global data
-    if len(recent) == 0:
+    if recent is None:
         last_price = 18500.0   # US median used car price
         mom_rate   = 0.003     # ~3.6% annual appreciation
+        fc_30, fc_90 = extrapolate(last_price, mom_rate)
         return {
             "last_known_price": last_price,
-            "forecast_30d":     round(last_price * (1 + mom_rate), 2),
-            "forecast_90d":     round(last_price * (1 + mom_rate * 3), 2),
+            "forecast_30d":     round(fc_30, 2),
+            "forecast_90d":     round(fc_90, 2),
             "trend_direction":  "rising",
             "trend_pct_change": round(mom_rate * 100, 2),
             "trend_pct_90d":    round(mom_rate * 3 * 100, 2),
@@ -113,16 +275,12 @@ def _market_trend_forecast() -> dict:
             "method":           "industry_default",
         }
 
-    last_price = float(recent[0]["avg_price"])
-
-    if len(recent) < 2:
-        mom_rate = 0.003
-    else:
-        prev_price = float(recent[1]["avg_price"])
-        mom_rate   = (last_price - prev_price) / prev_price if prev_price else 0.003
+    last_price = float(recent["last"])
+    mom_rate   = float(recent["mom"])
 
-    fc_30  = round(last_price * (1 + mom_rate), 2)
-    fc_90  = round(last_price * (1 + mom_rate * 3), 2)
+    fc_30, fc_90 = extrapolate(last_price, mom_rate)
+    fc_30  = round(fc_30, 2)
+    fc_90  = round(fc_90, 2)
     pct_30 = round(mom_rate * 100, 2)
 
     return {
@@ -137,46 +295,41 @@ def _market_trend_forecast() -> dict:
     }
 
 
+@ttl_cache(_CACHE_MAXSIZE, _CACHE_TTL_S, key=_vehicle_key, shared=True, should_cache=_data_backed)
 def run_forecast(make: str, model: str, year: int) -> dict:
     """
-    Fetch price history from MongoDB then run Facebook Prophet.
+    Fetch price history from MongoDB then fit a 30/90-day forecast.
     Accepts make/model/year directly so the LLM doesn't need to pipe
     raw data between tool calls.
 
     Fallback chain:
       0 months of car data  → market-wide average trend (or industry default)
       1–2 months            → linear extrapolation
-      3+ months             → Prophet time-series model
+      3+ months             → least-squares trend + yearly seasonality
+                              (Facebook Prophet instead when USE_PROPHET is set
+                              and there are 36+ months)
     """
-    try:
-        from prophet import Prophet  # lazy import — heavy dep
-    except ImportError:
-        return {"error": "prophet not installed. Run: pip install prophet"}
-
     price_history = get_price_history(make, model, year)
-    has_car_data  = price_history and "error" not in price_history[0]
 
     # ── No car-specific data → fall back to market-wide trend ────────────────
-    if not has_car_data:
+    if not _has_history(price_history):
         return _market_trend_forecast()
 
-    df = pd.DataFrame(price_history)
-    df["ds"] = pd.to_datetime(df["date"], format="%Y-%m", errors="coerce")
-    df["y"]  = pd.to_numeric(df["avg_price"], errors="coerce")
-    df = df.dropna(subset=["ds", "y"])
+    months, y = _history_arrays(price_history)
 
-    if len(df) == 0:
+    if len(y) == 0:
         return _market_trend_forecast()
 
     # ── Linear fallback for sparse data (1–2 months) ─────────────────────────
-    if len(df) < 3:
-        last_price  = float(df["y"].iloc[-1])
-        first_price = float(df["y"].iloc[0])
-        n_months    = max(1, len(df) - 1)
+    if len(y) < 3:
+        last_price  = float(y[-1])
+        first_price = float(y[0])
+        n_months    = max(1, len(y) - 1)
         mom_rate    = (last_price - first_price) / first_price / n_months  # per-month rate
 
-        fc_30 = round(last_price * (1 + mom_rate), 2)
-        fc_90 = round(last_price * (1 + mom_rate * 3), 2)
+        fc_30, fc_90 = extrapolate(last_price, mom_rate)
+        fc_30 = round(fc_30, 2)
+        fc_90 = round(fc_90, 2)
         pct_30 = round(mom_rate * 100, 2)
 
         return {
@@ -186,40 +339,112 @@ def run_forecast(make: str, model: str, year: int) -> dict:
             "trend_direction":   "rising" if pct_30 > 0 else "falling",
             "trend_pct_change":  pct_30,
             "trend_pct_90d":     round(mom_rate * 3 * 100, 2),
-            "seasonality_note":  "Linear extrapolation (only 2 months of data — Prophet needs ≥ 3)",
+            "seasonality_note":  "Linear extrapolation (only 2 months of data — trend model needs ≥ 3)",
             "method":            "linear",
         }
 
+    last_price = float(y[-1])
+
+    if _USE_PROPHET and len(y) >= _PROPHET_MIN_POINTS:
+        try:
+            return _prophet_forecast(months, y, last_price)
+        except ImportError:
+            pass  # prophet not installed — use the closed-form fit below
+
+    # datetime64[M] counts months since 1970-01, which keeps January at phase 0
+    (fc_30, fc_90), peak = ols_seasonal_forecast(months.astype(np.int64), y, (1, 3))
+    fc_30 = round(float(fc_30), 2)
+    fc_90 = round(float(fc_90), 2)
+
+    pct_30 = round((fc_30 - last_price) / last_price * 100, 2)
+    pct_90 = round((fc_90 - last_price) / last_price * 100, 2)
+
+    return {
+        "last_known_price":   round(last_price, 2),
+        "forecast_30d":       fc_30,
+        "forecast_90d":       fc_90,
+        "trend_direction":    "rising" if pct_30 > 0 else "falling",
+        "trend_pct_change":   pct_30,
+        "trend_pct_90d":      pct_90,
+        "seasonality_note":   f"Prices expected to peak around {_MONTHS[peak - 1]} in the forecast window",
+        "method":             "ols_seasonal",
+    }
+
+
+def _history_arrays(price_history: list[dict]) -> tuple[np.ndarray, np.ndarray]:
+    """(months as datetime64[M], avg prices) from get_price_history rows.
+
+    Rows with an unparseable date or price are dropped.
+    """
+    # Fast path: the server-side $project guarantees well-formed rows, so both
+    # columns convert in one vectorised pass each.
+    try:
+        months = np.array([row["date"] for row in price_history], dtype="datetime64[M]")
+        y      = np.fromiter((row["avg_price"] for row in price_history),
+                             dtype=np.float64, count=len(price_history))
+    except (KeyError, TypeError, ValueError):
+        pass
+    else:
+        keep = ~(np.isnat(months) | np.isnan(y))
+        return months[keep], y[keep]
+
+    n      = len(price_history)
+    months = np.empty(n, dtype="datetime64[M]")
+    y      = np.empty(n, dtype=np.float64)
+    for i, row in enumerate(price_history):
+        try:
+            months[i] = np.datetime64(str(row["date"])[:7], "M")
+            y[i]      = float(row["avg_price"])
+        except (KeyError, TypeError, ValueError):
+            months[i] = np.datetime64("NaT")
+            y[i]      = np.nan
+    keep = ~(np.isnat(months) | np.isnan(y))
+    return months[keep], y[keep]
+
+
+_prophet_cache = TTLCache(maxsize=128, ttl=86_400)
+
+
+def _prophet_forecast(months: np.ndarray, y: np.ndarray, last_price: float) -> dict:
+    """Prophet fit for ``USE_PROPHET`` mode. Raises ImportError if not installed.
+
+    Results are cached for a day keyed on a hash of the input series, so an
+    unchanged history never triggers a second Stan fit.
+    """
+    from prophet import Prophet  # lazy import — heavy dep
+
+    series_key = hashlib.blake2b(months.tobytes() + y.tobytes(), digest_size=16).digest()
+    cached = _prophet_cache.get(series_key)
+    if cached is not None:
+        return dict(cached)
+
+    df = pd.DataFrame({"ds": months.astype("datetime64[ns]"), "y": y}, copy=False)
+
     m = Prophet(
         yearly_seasonality=True,
         weekly_seasonality=False,
         daily_seasonality=False,
         changepoint_prior_scale=0.3,
     )
-    m.fit(df[["ds", "y"]])
-
-    future   = m.make_future_dataframe(periods=90, freq="D")
-    forecast = m.predict(future)
+    m.fit(df)
 
-    last_price = float(df["y"].iloc[-1])
-    last_date  = df["ds"].max()
+    # Predict only the dates we read: the 30/90-day points plus weekly samples
+    # across the 90-day window for the peak-month search.
+    offsets   = np.union1d(np.arange(1, 91, 7), [30, 90])
+    last_date = pd.Timestamp(months.max())
+    target    = last_date + pd.to_timedelta(offsets, unit="D")
+    yhat      = m.predict(pd.DataFrame({"ds": target}))["yhat"].to_numpy()
 
-    def _price_at(days: int) -> float:
-        target = last_date + timedelta(days=days)
-        idx    = (forecast["ds"] - target).abs().idxmin()
-        return round(float(forecast.loc[idx, "yhat"]), 2)
-
-    fc_30 = _price_at(30)
-    fc_90 = _price_at(90)
+    fc_30 = round(float(yhat[np.searchsorted(offsets, 30)]), 2)
+    fc_90 = round(float(yhat[np.searchsorted(offsets, 90)]), 2)
 
     pct_30 = round((fc_30 - last_price) / last_price * 100, 2)
     pct_90 = round((fc_90 - last_price) / last_price * 100, 2)
 
-    # Seasonality note: find the month with the highest yhat in the next 90 days
-    future_fc = forecast[forecast["ds"] > last_date].copy()
-    peak_month = future_fc.loc[future_fc["yhat"].idxmax(), "ds"].strftime("%B")
+    # Seasonality note: the month with the highest yhat in the next 90 days
+    peak_month = _MONTHS[target[int(np.argmax(yhat))].month - 1]
 
-    return {
+    result = {
         "last_known_price":   round(last_price, 2),
         "forecast_30d":       fc_30,
         "forecast_90d":       fc_90,
@@ -229,6 +454,23 @@ def run_forecast(make: str, model: str, year: int) -> dict:
         "seasonality_note":   f"Prices expected to peak around {peak_month} in the forecast window",
         "method":             "prophet",
     }
+    _prophet_cache.set(series_key, result)
+    return dict(result)
+
+
+def _predict_rows(rows: list[dict]) -> list[tuple[float, list[dict]]]:
+    prices, factors = predict_and_explain(rows)
+    return list(zip(prices, factors))
+
+
+# Opt-in: with PREDICT_BATCH_WINDOW_MS > 0, concurrent predictions (parallel
+# pipelines / agent sessions) are coalesced into one model + SHAP call.
+_PREDICT_BATCH_WINDOW_MS = float(os.getenv("PREDICT_BATCH_WINDOW_MS", "0"))
+_predict_batcher = (
+    MicroBatcher(_predict_rows, max_batch=64, window_ms=_PREDICT_BATCH_WINDOW_MS,
+                 name="predict-batcher")
+    if _PREDICT_BATCH_WINDOW_MS > 0 else None
+)
 
 
 def run_price_prediction(
@@ -240,7 +482,23 @@ def run_price_prediction(
     region: str,
 ) -> dict:
     """Load XGBoost model, predict price, return top-3 SHAP factors."""
-    row = {
+    row = listing_row(make, model, year, mileage, condition, region)
+    if _predict_batcher is not None:
+        predicted, shap_factors = _predict_batcher.submit(row)
+    else:
+        (predicted,), (shap_factors,) = predict_and_explain([row])
+
+    return {
+        "predicted_price": round(predicted, 2),
+        "shap_factors":    shap_factors,   # [{feature, value, impact, direction}]
+    }
+
+
+def listing_row(
+    make: str, model: str, year: int, mileage: int, condition: str, region: str,
+) -> dict:
+    """Model input row for a user query; unspecified attributes get typical defaults."""
+    return {
         "make":        make.lower(),
         "model":       model.lower(),
         "year":        year,
@@ -256,15 +514,9 @@ def run_price_prediction(
         "paint_color": "white",
         "state":       region[:2].lower(),
     }
-    predicted = predict_price(row)
-    shap_factors = explain_prediction(row)
-
-    return {
-        "predicted_price": round(predicted, 2),
-        "shap_factors":    shap_factors,   # [{feature, value, impact, direction}]
-    }
 
 
+@ttl_cache(_CACHE_MAXSIZE, _CACHE_TTL_S, key=_vehicle_key, shared=True)
 def get_market_context(make: str, model: str, year: int) -> dict:
     """Return inventory count, trend, price-vs-median, and regional range.
 
@@ -283,17 +535,35 @@ def get_market_context(make: str, model: str, year: int) -> dict:
     model_l = model.lower()
     filter_ = {"make": make_l, "model": model_l, "year": year}
 
-    # Current listing count from listings collection
-    total_count = _db["listings"].count_documents(filter_)
+    # Current listing count from listings collection — a different collection,
+    # so it runs alongside the snapshot aggregation below.
+    count_fut = _IO_POOL.submit(get_db()["listings"].count_documents, filter_)
 
-    # Inventory trend: compare snapshot listing_count across most recent 2 periods
-    recent = list(
-        _db["price_snapshots"]
-        .find(filter_, {"_id": 0, "year_month": 1, "listing_count": 1, "avg_price": 1})
-        .sort("year_month", -1)
-        .limit(2)
-    )
+    # One round trip for both the 2 most recent snapshots (inventory trend)
+    # and the overall price stats for this make/model/year.
+    facet = next(get_db()["price_snapshots"].aggregate([
+        {"$match": filter_},
+        {"$facet": {
+            "recent": [
+                {"$sort": {"year_month": -1}},
+                {"$limit": 2},
+                {"$project": {"_id": 0, "year_month": 1, "listing_count": 1, "avg_price": 1}},
+            ],
+            "stats": [
+                {"$group": {
+                    "_id": None,
+                    "overall_avg": {"$avg": "$avg_price"},
+                    "min_price":   {"$min": "$avg_price"},
+                    "max_price":   {"$max": "$avg_price"},
+                }},
+            ],
+        }},
+    ]), {"recent": [], "stats": []})
+    recent = facet["recent"]
+    agg    = facet["stats"]
+    total_count = count_fut.result()
 
+    # Inventory trend: compare snapshot listing_count across most recent 2 periods
     inventory_trend = "unknown"
     price_vs_median_pct = 0.0
     if len(recent) == 2:
@@ -302,16 +572,6 @@ def get_market_context(make: str, model: str, year: int) -> dict:
         inventory_trend = "rising" if curr_cnt >= prev_cnt else "falling"
 
     # Overall median price for this make/model/year
-    pipeline = [
-        {"$match": filter_},
-        {"$group": {
-            "_id": None,
-            "overall_avg": {"$avg": "$avg_price"},
-            "min_price":   {"$min": "$avg_price"},
-            "max_price":   {"$max": "$avg_price"},
-        }},
-    ]
-    agg = list(_db["price_snapshots"].aggregate(pipeline))
     if agg:
         overall_avg = agg[0]["overall_avg"] or 0
         min_price   = round(agg[0]["min_price"], 2)
@@ -321,7 +581,7 @@ def get_market_context(make: str, model: str, year: int) -> dict:
         price_vs_median_pct = round((latest_avg - overall_avg) / overall_avg * 100, 2) if overall_avg else 0.0
     else:
         # No make-specific data — try global snapshot average for price range display
-        global_agg = list(_db["price_snapshots"].aggregate([
+        global_agg = list(get_db()["price_snapshots"].aggregate([
             {"$group": {"_id": None,
                         "avg": {"$avg": "$avg_price"},
                         "mn":  {"$min": "$avg_price"},
@@ -360,6 +620,7 @@ def run_llm_price_analysis(
     trend_pct_30d: float,
     inventory_trend: str,
     price_vs_median_pct: float,
+    current_month: str | None = None,
 ) -> dict:
     """
     GPT-4o-mini powered price analysis that synthesises all available data
@@ -368,64 +629,273 @@ def run_llm_price_analysis(
 
     Returns blended forecast values, a trend call, confidence, key insight,
     and a best-time-to-buy signal — all used by synthesize_recommendation.
+    ``current_month`` defaults to the current UTC month name.
+
+    Degenerate inputs (no price or no statistical forecast) skip the LLM and
+    return the statistical values with method "skip_no_data".  Successful
+    analyses are memoised for 30 minutes on quantised inputs, so near-identical
+    queries (same car, mileage within 5k, prices within $100) share one call.
     """
-    current_month = datetime.now().strftime("%B")
+    if _llm_inputs_degenerate(current_price, stat_forecast_30d, trend_direction, inventory_trend):
+        _record_llm_call("skipped")
+        return _llm_skip_result(stat_forecast_30d, stat_forecast_90d, trend_direction)
+
+    cache_key = _llm_cache_key(
+        make, model, year, mileage, condition, region,
+        current_price, stat_forecast_30d, trend_direction,
+    )
+    cached = _llm_cache.get(cache_key)
+    if cached is not None:
+        _record_llm_call("cached")
+        return dict(cached)
+    _record_llm_call("called")
+
+    current_month = current_month or _current_month()
     prompt = (
         f"You are an expert automotive market analyst. Analyse this used car and forecast prices.\n\n"
-        f"Vehicle: {year} {make.title()} {model.title()}\n"
-        f"Details: {mileage:,} miles | {condition} condition | {region} region\n"
-        f"Current month: {current_month}\n\n"
-        f"Data inputs:\n"
-        f"  XGBoost fair market value : ${current_price:,.0f}\n"
-        f"  Statistical 30-day forecast: ${stat_forecast_30d:,.0f} ({trend_pct_30d:+.1f}%)\n"
-        f"  Statistical 90-day forecast: ${stat_forecast_90d:,.0f}\n"
-        f"  Market trend              : {trend_direction}\n"
-        f"  Inventory trend           : {inventory_trend}\n"
-        f"  Price vs market median    : {price_vs_median_pct:+.1f}%\n\n"
-        f"Consider: typical depreciation for this make/model age, seasonal demand patterns, "
+        + _llm_vehicle_block(
+            make, model, year, mileage, condition, region, current_price,
+            stat_forecast_30d, stat_forecast_90d, trend_direction, trend_pct_30d,
+            inventory_trend, price_vs_median_pct, current_month,
+        )
+        + f"\nConsider: typical depreciation for this make/model age, seasonal demand patterns, "
         f"regional supply, and whether the statistical forecast seems reasonable.\n\n"
         f"Respond with ONLY valid JSON:\n"
         f'{{\n'
-        f'  "forecast_30d": <number — your best predicted price in 30 days>,\n'
-        f'  "forecast_90d": <number — your best predicted price in 90 days>,\n'
-        f'  "trend_direction": "rising" | "falling" | "stable",\n'
-        f'  "confidence": "HIGH" | "MODERATE" | "LOW",\n'
-        f'  "key_insight": "<one concise sentence about the most important price driver>",\n'
-        f'  "best_time_to_buy": "now" | "30_days" | "90_days" | "wait"\n'
-        f'}}'
+        + _LLM_ANALYSIS_FIELDS
+        + f'}}'
     )
 
     try:
-        resp = _oai.chat.completions.create(
+        resp = chat_completion(
             model=MODEL,
             messages=[
-                {"role": "system", "content": "You are an expert automotive market analyst. Always respond with valid JSON only."},
+                {"role": "system", "content": _LLM_ANALYST_SYSTEM},
                 {"role": "user",   "content": prompt},
             ],
             temperature=0.15,
             response_format={"type": "json_object"},
         )
-        data = json.loads(resp.choices[0].message.content)
-        return {
-            "forecast_30d":       float(data.get("forecast_30d", stat_forecast_30d)),
-            "forecast_90d":       float(data.get("forecast_90d", stat_forecast_90d)),
-            "trend_direction":    str(data.get("trend_direction", trend_direction)),
-            "confidence":         str(data.get("confidence", "MODERATE")),
-            "key_insight":        str(data.get("key_insight", "")),
-            "best_time_to_buy":   str(data.get("best_time_to_buy", "neutral")),
-            "method":             "llm_analysis",
-        }
+        data = orjson.loads(resp.choices[0].message.content)
+        result = _parse_llm_analysis(data, stat_forecast_30d, stat_forecast_90d, trend_direction)
     except Exception as exc:
-        # Graceful fallback — return statistical values so the pipeline continues
-        return {
-            "forecast_30d":     stat_forecast_30d,
-            "forecast_90d":     stat_forecast_90d,
-            "trend_direction":  trend_direction,
-            "confidence":       "LOW",
-            "key_insight":      f"LLM analysis unavailable ({exc}); using statistical forecast.",
-            "best_time_to_buy": "neutral",
-            "method":           "llm_fallback",
-        }
+        # Fallbacks are not cached so the next request retries the LLM
+        return _llm_analysis_fallback(stat_forecast_30d, stat_forecast_90d, trend_direction, exc)
+    _llm_cache.set(cache_key, result)
+    return dict(result)
+
+
+_LLM_ANALYST_SYSTEM = "You are an expert automotive market analyst. Always respond with valid JSON only."
+
+_LLM_ANALYSIS_FIELDS = (
+    '  "forecast_30d": <number — your best predicted price in 30 days>,\n'
+    '  "forecast_90d": <number — your best predicted price in 90 days>,\n'
+    '  "trend_direction": "rising" | "falling" | "stable",\n'
+    '  "confidence": "HIGH" | "MODERATE" | "LOW",\n'
+    '  "key_insight": "<one concise sentence about the most important price driver>",\n'
+    '  "best_time_to_buy": "now" | "30_days" | "90_days" | "wait"\n'
+)
+
+# Vehicles per batched request — keeps the JSON reply well inside the
+# model's output limit (~120 tokens per vehicle).
+_LLM_BATCH_SIZE = 10
+
+
+def _llm_vehicle_block(
+    make: str, model: str, year: int, mileage: int, condition: str, region: str,
+    current_price: float, stat_forecast_30d: float, stat_forecast_90d: float,
+    trend_direction: str, trend_pct_30d: float, inventory_trend: str,
+    price_vs_median_pct: float, current_month: str | None = None,
+) -> str:
+    """Vehicle + data-inputs section shared by the single and batched prompts."""
+    return (
+        f"Vehicle: {year} {make.title()} {model.title()}\n"
+        f"Details: {mileage:,} miles | {condition} condition | {region} region\n"
+        + (f"Current month: {current_month}\n\n" if current_month else "")
+        + f"Data inputs:\n"
+        f"  XGBoost fair market value : ${current_price:,.0f}\n"
+        f"  Statistical 30-day forecast: ${stat_forecast_30d:,.0f} ({trend_pct_30d:+.1f}%)\n"
+        f"  Statistical 90-day forecast: ${stat_forecast_90d:,.0f}\n"
+        f"  Market trend              : {trend_direction}\n"
+        f"  Inventory trend           : {inventory_trend}\n"
+        f"  Price vs market median    : {price_vs_median_pct:+.1f}%\n"
+    )
+
+
+_llm_cache = TTLCache(maxsize=2048, ttl=1800)
+
+# Outcome counters for run_llm_price_analysis (see llm_skip_stats)
+_llm_stats      = {"called": 0, "cached": 0, "skipped": 0}
+_llm_stats_lock = threading.Lock()
+
+
+def _record_llm_call(outcome: str) -> None:
+    with _llm_stats_lock:
+        _llm_stats[outcome] += 1
+
+
+def llm_skip_stats() -> dict:
+    """Counts of LLM price analyses issued, served from cache, and short-circuited."""
+    with _llm_stats_lock:
+        return dict(_llm_stats)
+
+
+def _llm_cache_key(
+    make: str, model: str, year: int, mileage: int, condition: str, region: str,
+    current_price: float, stat_forecast_30d: float, trend_direction: str, **_: Any,
+) -> tuple:
+    """Quantised key so near-duplicate vehicles share a cached analysis."""
+    return (
+        make.lower(), model.lower(), year, int(mileage) // 5000, condition, region,
+        round(current_price, -2), round(stat_forecast_30d, -2), trend_direction,
+    )
+
+
+def _llm_inputs_degenerate(
+    current_price: float, stat_forecast_30d: float, trend_direction: str, inventory_trend: str,
+) -> bool:
+    """True when there is nothing for the LLM to reason about."""
+    return (
+        current_price <= 0
+        or stat_forecast_30d <= 0
+        or (not trend_direction and inventory_trend == "unknown")
+    )
+
+
+def _llm_skip_result(
+    stat_forecast_30d: float, stat_forecast_90d: float, trend_direction: str,
+) -> dict:
+    return {
+        "forecast_30d":     stat_forecast_30d,
+        "forecast_90d":     stat_forecast_90d,
+        "trend_direction":  trend_direction,
+        "confidence":       "LOW",
+        "key_insight":      "Insufficient market data for AI analysis.",
+        "best_time_to_buy": "neutral",
+        "method":           "skip_no_data",
+    }
+
+
+def _parse_llm_analysis(
+    data: dict, stat_forecast_30d: float, stat_forecast_90d: float, trend_direction: str,
+) -> dict:
+    return {
+        "forecast_30d":       float(data.get("forecast_30d", stat_forecast_30d)),
+        "forecast_90d":       float(data.get("forecast_90d", stat_forecast_90d)),
+        "trend_direction":    str(data.get("trend_direction", trend_direction)),
+        "confidence":         str(data.get("confidence", "MODERATE")),
+        "key_insight":        str(data.get("key_insight", "")),
+        "best_time_to_buy":   str(data.get("best_time_to_buy", "neutral")),
+        "method":             "llm_analysis",
+    }
+
+
+def _llm_analysis_fallback(
+    stat_forecast_30d: float, stat_forecast_90d: float, trend_direction: str, exc: Exception,
+) -> dict:
+    # Graceful fallback — return statistical values so the pipeline continues
+    return {
+        "forecast_30d":     stat_forecast_30d,
+        "forecast_90d":     stat_forecast_90d,
+        "trend_direction":  trend_direction,
+        "confidence":       "LOW",
+        "key_insight":      f"LLM analysis unavailable ({exc}); using statistical forecast.",
+        "best_time_to_buy": "neutral",
+        "method":           "llm_fallback",
+    }
+
+
+def run_llm_price_analysis_batch(vehicles: list[dict]) -> list[dict]:
+    """
+    Batched run_llm_price_analysis for multi-vehicle callers (dashboards,
+    backtests).  Each dict in ``vehicles`` holds run_llm_price_analysis's
+    keyword arguments; results come back in the same order.
+
+    Up to _LLM_BATCH_SIZE vehicles share one GPT-4o-mini request that returns
+    {"results": [...]}.  Vehicles missing from a batched reply — or a whole
+    batch whose request fails — are retried one at a time.
+    """
+    results: list[dict | None] = [None] * len(vehicles)
+    current_month = _current_month()
+
+    # Degenerate inputs and cache hits are answered by run_llm_price_analysis
+    # without an LLM call; keep them out of the batched prompts.
+    pending = []
+    for idx, v in enumerate(vehicles):
+        if _llm_inputs_degenerate(
+            v["current_price"], v["stat_forecast_30d"], v["trend_direction"], v["inventory_trend"],
+        ) or _llm_cache.get(_llm_cache_key(**v)) is not None:
+            results[idx] = run_llm_price_analysis(**v)
+        else:
+            pending.append(idx)
+
+    for start in range(0, len(pending), _LLM_BATCH_SIZE):
+        chunk_idx = pending[start:start + _LLM_BATCH_SIZE]
+        chunk     = [vehicles[idx] for idx in chunk_idx]
+        prompt = (
+            f"You are an expert automotive market analyst. Analyse each of these "
+            f"{len(chunk)} used cars and forecast prices.\n"
+            f"Current month: {current_month}\n\n"
+            + "\n".join(f"[id {i}]\n" + _llm_vehicle_block(**v) for i, v in enumerate(chunk))
+            + "\nConsider: typical depreciation for each make/model age, seasonal demand patterns, "
+            "regional supply, and whether each statistical forecast seems reasonable.\n\n"
+            'Respond with ONLY valid JSON: {"results": [ one object per vehicle:\n'
+            "{\n"
+            '  "id": <the vehicle id above>,\n'
+            + _LLM_ANALYSIS_FIELDS
+            + "} ]}"
+        )
+        try:
+            resp = chat_completion(
+                model=MODEL,
+                messages=[
+                    {"role": "system", "content": _LLM_ANALYST_SYSTEM},
+                    {"role": "user",   "content": prompt},
+                ],
+                temperature=0.15,
+                response_format={"type": "json_object"},
+            )
+            by_id = {
+                int(item["id"]): item
+                for item in orjson.loads(resp.choices[0].message.content).get("results", [])
+                if isinstance(item, dict) and "id" in item
+            }
+        except Exception:
+            by_id = {}
+
+        for i, (idx, v) in enumerate(zip(chunk_idx, chunk)):
+            if i in by_id:
+                _record_llm_call("called")
+                results[idx] = _parse_llm_analysis(
+                    by_id[i], v["stat_forecast_30d"], v["stat_forecast_90d"], v["trend_direction"],
+                )
+                _llm_cache.set(_llm_cache_key(**v), dict(results[idx]))
+            else:
+                results[idx] = run_llm_price_analysis(**{"current_month": current_month, **v})
+
+    return results
+
+
+# Rationale text per decision case, filled with a single str.format call.
+_RATIONALE_TEMPLATES = {
+    "deal": (
+        "This listing is {abs_pct:.1f}% below the market median — "
+        "a compelling deal regardless of short-term price direction. "
+        "Strong value opportunity: buy before inventory tightens."
+    ),
+    "rising_below_median": (
+        "Prices are {trend} ({tpct:+.1f}% over 30 days) and this listing "
+        "is {abs_pct:.1f}% below the market median — buy before prices climb further."
+    ),
+    "falling": (
+        "Prices are falling ({tpct:+.1f}% over 30 days) — waiting could "
+        "save you money in the near term."
+    ),
+    "flat": (
+        "Market trend is flat ({tpct:+.1f}%) and this listing is "
+        "{pct:+.1f}% vs the median — no strong signal either way."
+    ),
+}
 
 
 def synthesize_recommendation(
@@ -459,8 +929,12 @@ def synthesize_recommendation(
     use_llm = llm_forecast_30d > 0 and stat_forecast_30d > 0
 
     if use_llm:
-        blended_30d     = round(0.4 * stat_forecast_30d + 0.6 * llm_forecast_30d, 2)
-        blended_90d     = round(0.3 * stat_forecast_90d + 0.7 * llm_forecast_90d, 2)
+        blended_30d, blended_90d = blend_forecasts(
+            float(stat_forecast_30d), float(stat_forecast_90d),
+            float(llm_forecast_30d), float(llm_forecast_90d),
+        )
+        blended_30d     = round(blended_30d, 2)
+        blended_90d     = round(blended_90d, 2)
         forecast_method = "llm_blended"
         effective_trend = llm_trend_direction if llm_trend_direction else trend_direction
         effective_pct   = (
@@ -476,8 +950,9 @@ def synthesize_recommendation(
     else:
         p               = float(predicted_price) if predicted_price else 18500.0
         t               = float(trend_pct_change)
-        blended_30d     = round(p * (1 + t / 100), 2)
-        blended_90d     = round(p * (1 + t / 100 * 3), 2)
+        blended_30d, blended_90d = extrapolate(p, t / 100)
+        blended_30d     = round(blended_30d, 2)
+        blended_90d     = round(blended_90d, 2)
         forecast_method = "estimated"
         effective_trend = trend_direction
         effective_pct   = t
@@ -496,52 +971,30 @@ def synthesize_recommendation(
         pct_vs_med = round((float(predicted_price) - _INDUSTRY_AVG) / _INDUSTRY_AVG * 100, 2)
 
     # ── Core BUY / WAIT / NEUTRAL logic ──────────────────────────────────────
-    # Strong-deal override: listing is significantly below market regardless of trend
     if pct_vs_med <= -10:
-        signal     = "BUY"
-        confidence = "HIGH" if pct_vs_med <= -15 else "MODERATE"
-        if llm_best_time_to_buy == "now":
-            confidence = "HIGH"
-        rationale  = (
-            f"This listing is {abs(pct_vs_med):.1f}% below the market median — "
-            f"a compelling deal regardless of short-term price direction. "
-            f"Strong value opportunity: buy before inventory tightens."
-        )
-
+        # Strong-deal override: listing is significantly below market regardless of trend
+        case, signal = "deal", "BUY"
+        confidence   = "HIGH" if pct_vs_med <= -15 or llm_best_time_to_buy == "now" else "MODERATE"
     elif effective_trend == "rising" and pct_vs_med < 0:
-        signal     = "BUY"
-        confidence = "HIGH" if pct_vs_med < -5 else "MODERATE"
-        # LLM can boost confidence
-        if llm_best_time_to_buy == "now" and confidence == "MODERATE":
-            confidence = "HIGH"
-        rationale  = (
-            f"Prices are {effective_trend} ({trend_pct:+.1f}% over 30 days) and this listing "
-            f"is {abs(pct_vs_med):.1f}% below the market median — buy before prices climb further."
-        )
-
+        # LLM "now" can boost confidence
+        case, signal = "rising_below_median", "BUY"
+        confidence   = "HIGH" if pct_vs_med < -5 or llm_best_time_to_buy == "now" else "MODERATE"
     elif effective_trend == "falling" and trend_pct < -2:
-        signal     = "WAIT"
-        confidence = "HIGH" if trend_pct < -5 else "MODERATE"
-        rationale  = (
-            f"Prices are falling ({trend_pct:+.1f}% over 30 days) — waiting could "
-            f"save you money in the near term."
-        )
-
+        case, signal = "falling", "WAIT"
+        confidence   = "HIGH" if trend_pct < -5 else "MODERATE"
     else:
-        signal     = "NEUTRAL"
-        confidence = "LOW"
+        case, signal, confidence = "flat", "NEUTRAL", "LOW"
         # LLM can override a neutral signal when evidence is moderate
         if llm_best_time_to_buy == "now" and pct_vs_med < -3:
             signal, confidence = "BUY", "MODERATE"
-        elif llm_best_time_to_buy in ("wait",) and trend_pct < 0:
+        elif llm_best_time_to_buy == "wait" and trend_pct < 0:
             signal, confidence = "WAIT", "MODERATE"
-        rationale  = (
-            f"Market trend is flat ({trend_pct:+.1f}%) and this listing is "
-            f"{pct_vs_med:+.1f}% vs the median — no strong signal either way."
-        )
 
+    rationale = _RATIONALE_TEMPLATES[case].format(
+        trend=effective_trend, tpct=trend_pct, pct=pct_vs_med, abs_pct=abs(pct_vs_med),
+    )
     if llm_key_insight:
-        rationale += f" {llm_key_insight}"
+        rationale = f"{rationale} {llm_key_insight}"
 
     return {
         "recommendation": signal,
@@ -580,7 +1033,7 @@ TOOLS: list[dict] = [
         "type": "function",
         "function": {
             "name": "run_forecast",
-            "description": "Fetch price history from MongoDB and run a Prophet time-series forecast. Returns 30/90-day forecasts and trend direction.",
+            "description": "Fetch price history from MongoDB and run a trend + seasonality time-series forecast. Returns 30/90-day forecasts and trend direction.",
             "parameters": {
                 "type": "object",
                 "properties": {
@@ -701,36 +1154,182 @@ TOOLS: list[dict] = [
 # Tool dispatcher
 # ══════════════════════════════════════════════════════════════════════════════
 
-_TOOL_FN_MAP = {
-    "get_price_history":        get_price_history,
-    "run_forecast":             run_forecast,
-    "run_price_prediction":     run_price_prediction,
-    "get_market_context":       get_market_context,
-    "run_llm_price_analysis":   run_llm_price_analysis,
-    "synthesize_recommendation": synthesize_recommendation,
+def clear_caches() -> None:
+    """Drop all memoised per-vehicle tool results (e.g. after re-ingesting data)."""
+    for fn in (get_price_history, run_forecast, get_market_context, _market_trend_forecast):
+        fn.cache_clear()
+
+
+# Tool name → adapter taking the parsed JSON arguments.  The per-vehicle
+# tools take exactly (make, model, year), so they are called positionally
+# instead of through **kwargs unpacking.
+_TOOL_FN_MAP: dict[str, Callable[[dict], Any]] = {
+    "get_price_history":         lambda a: get_price_history(a["make"], a["model"], a["year"]),
+    "run_forecast":              lambda a: run_forecast(a["make"], a["model"], a["year"]),
+    "get_market_context":        lambda a: get_market_context(a["make"], a["model"], a["year"]),
+    "run_price_prediction":      lambda a: run_price_prediction(**a),
+    "run_llm_price_analysis":    lambda a: run_llm_price_analysis(**a),
+    "synthesize_recommendation": lambda a: synthesize_recommendation(**a),
 }
 
 
+# Every agent request starts with the same system message and tool list, in
+# the same order and byte-for-byte identical, so OpenAI's automatic prompt
+# caching can reuse the prefix across queries.  Treat both as read-only.
+_SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_PROMPT}
+
+# Runs the tool calls of one LLM round concurrently (see run_agent).
+# Tool results may carry numpy scalars/arrays and int-keyed dicts.
+_ORJSON_OPTS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+_TOOL_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="agent-tools")
+
+
 def _dispatch(tool_name: str, args: dict) -> Any:
     fn = _TOOL_FN_MAP.get(tool_name)
     if fn is None:
         return {"error": f"Unknown tool: {tool_name}"}
-    return fn(**args)
+    return fn(args)
 
 
 # ══════════════════════════════════════════════════════════════════════════════
 # Agent loop
 # ══════════════════════════════════════════════════════════════════════════════
 
-def run_agent(user_query: str, max_tool_rounds: int = 12) -> dict:
+def _stream_completion(**kwargs: Any) -> Iterator:
+    """Streaming ``chat.completions.create``; holds an OPENAI_CONCURRENCY slot
+    until the stream is drained."""
+    with _oai_slots:
+        yield from _oai.chat.completions.create(stream=True, **kwargs)
+
+
+def _agent_result(recommendation_result: dict, explanation: str, tool_outputs: dict) -> dict:
+    return {
+        "recommendation":  recommendation_result.get("recommendation", "NEUTRAL"),
+        "confidence":      recommendation_result.get("confidence", "LOW"),
+        "explanation":     explanation,
+        "predicted_price": recommendation_result.get("predicted_price", 0.0),
+        "forecast_30d":    recommendation_result.get("forecast_30d", 0.0),
+        "forecast_90d":    recommendation_result.get("forecast_90d", 0.0),
+        "forecast_method": recommendation_result.get("forecast_method", "statistical"),
+        "llm_key_insight": recommendation_result.get("llm_key_insight", ""),
+        "tool_outputs":    tool_outputs,
+    }
+
+
+def iter_agent(user_query: str, max_tool_rounds: int = 6) -> Iterator[dict]:
+    """
+    Run the tool-calling agent loop, yielding progress events as they happen.
+
+    Events
+    ------
+    {"event": "tool_result",       "name": str, "result": dict, "json": bytes}
+        after each tool completes; ``json`` is the encoded result sent to the LLM
+    {"event": "recommendation",    "result": dict}
+        as soon as synthesize_recommendation returns
+    {"event": "explanation_delta", "text": str}
+        explanation tokens as the final LLM turn streams them
+    {"event": "done",              "result": dict}
+        last event; ``result`` is what run_agent returns
+    """
+    messages: list[dict] = [
+        _SYSTEM_MESSAGE,
+        {"role": "user", "content": user_query},
+    ]
+
+    tool_outputs: dict = {}
+    recommendation_result: dict = {}
+
+    for _ in range(max_tool_rounds):
+        content: list[str] = []
+        tool_calls: dict[int, dict] = {}   # stream index → accumulated call
+
+        for chunk in _stream_completion(
+            model=MODEL,
+            messages=messages,
+            tools=TOOLS,
+            tool_choice="auto",
+        ):
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            if delta.content:
+                content.append(delta.content)
+                yield {"event": "explanation_delta", "text": delta.content}
+            for tc in delta.tool_calls or ():
+                call = tool_calls.setdefault(
+                    tc.index, {"id": "", "type": "function", "function": {"name": "", "arguments": ""}},
+                )
+                if tc.id:
+                    call["id"] = tc.id
+                if tc.function and tc.function.name:
+                    call["function"]["name"] += tc.function.name
+                if tc.function and tc.function.arguments:
+                    call["function"]["arguments"] += tc.function.arguments
+
+        # ── No more tool calls → final answer ────────────────────────────────
+        if not tool_calls:
+            yield {"event": "done",
+                   "result": _agent_result(recommendation_result, "".join(content), tool_outputs)}
+            return
+
+        # ── Execute each requested tool call ─────────────────────────────────
+        calls_in_order = [tool_calls[i] for i in sorted(tool_calls)]
+        messages.append({
+            "role":       "assistant",
+            "content":    "".join(content) or None,
+            "tool_calls": calls_in_order,
+        })
+
+        # Tool calls within a round are independent (their arguments are
+        # fixed by the model), so they run concurrently; results are appended
+        # in call order so each tool_call_id lines up with its output.
+        # Identical calls (same name and arguments) run once and share the result.
+        calls = [(c["function"]["name"], orjson.loads(c["function"]["arguments"] or "{}"))
+                 for c in calls_in_order]
+        keys = [(name, orjson.dumps(args, option=orjson.OPT_SORT_KEYS)) for name, args in calls]
+        unique = dict(zip(keys, calls))
+        if len(unique) == 1:
+            done = {k: _dispatch(*call) for k, call in unique.items()}
+        else:
+            done = dict(zip(unique, _TOOL_POOL.map(lambda call: _dispatch(*call), unique.values())))
+        results = [done[k] for k in keys]
+
+        for (name, _), call, result in zip(calls, calls_in_order, results):
+            # Encoded once: the same bytes feed the tool message and the event.
+            encoded = orjson.dumps(result, default=str, option=_ORJSON_OPTS)
+            tool_outputs[name] = result
+            yield {"event": "tool_result", "name": name, "result": result, "json": encoded}
+
+            # Capture synthesize_recommendation output for top-level return
+            if name == "synthesize_recommendation":
+                recommendation_result = result
+                yield {"event": "recommendation", "result": result}
+
+            messages.append({
+                "role":         "tool",
+                "tool_call_id": call["id"],
+                "content":      encoded.decode(),
+            })
+
+    yield {"event": "done",
+           "result": _agent_result(recommendation_result,
+                                   "Max tool rounds reached without final LLM response.",
+                                   tool_outputs)}
+
+
+def run_agent(user_query: str, max_tool_rounds: int = 6) -> dict:
     """
     Run the full tool-calling agent loop for a user car query.
+    Blocking wrapper over iter_agent that returns only the final result.
 
     Parameters
     ----------
     user_query     : Natural-language query, e.g. "Should I buy a 2018 Toyota Camry
                      with 45k miles in good condition in California?"
-    max_tool_rounds: Safety cap on tool-call iterations.
+    max_tool_rounds: Safety cap on tool-call iterations.  The prompt plans
+                     three tool rounds plus the final answer; the rest is
+                     headroom for a model that splits a round.
 
     Returns
     -------
@@ -746,68 +1345,151 @@ def run_agent(user_query: str, max_tool_rounds: int = 12) -> dict:
       "tool_outputs":   dict,  # raw output from every tool called
     }
     """
-    messages: list[dict] = [
-        {"role": "system", "content": SYSTEM_PROMPT},
-        {"role": "user",   "content": user_query},
-    ]
+    for event in iter_agent(user_query, max_tool_rounds):
+        if event["event"] == "done":
+            return event["result"]
+    raise RuntimeError("iter_agent ended without a done event")
+
+
+# ── Fixed-plan path ──────────────────────────────────────────────────────────
+# The tool DAG never changes for a "should I buy this car" query, so the LLM
+# is only needed to read the query and to write the explanation.
+
+_CAR_SPEC_SCHEMA = {
+    "name": "car_spec",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "make":      {"type": ["string", "null"], "description": "lowercase, e.g. 'toyota'"},
+            "model":     {"type": ["string", "null"], "description": "lowercase, e.g. 'camry'"},
+            "year":      {"type": ["integer", "null"]},
+            "mileage":   {"type": ["integer", "null"], "description": "odometer miles"},
+            "condition": {"type": ["string", "null"], "description": "e.g. good, excellent, fair"},
+            "region":    {"type": ["string", "null"], "description": "lowercase US state, e.g. california"},
+        },
+        "required": ["make", "model", "year", "mileage", "condition", "region"],
+        "additionalProperties": False,
+    },
+}
 
-    tool_outputs: dict = {}
-    recommendation_result: dict = {}
+_EXPLAIN_SYSTEM = (
+    "You are a car market analyst. Given the analysis data, write a 3-sentence "
+    "plain English explanation of the recommendation citing specific $ numbers. "
+    "Be direct. Do not hedge excessively."
+)
 
-    for _ in range(max_tool_rounds):
-        response = _oai.chat.completions.create(
-            model=MODEL,
-            messages=messages,
-            tools=TOOLS,
-            tool_choice="auto",
-        )
-        msg = response.choices[0].message
 
-        # ── No more tool calls → final answer ────────────────────────────────
-        if not msg.tool_calls:
-            explanation = msg.content or ""
-            return {
-                "recommendation":  recommendation_result.get("recommendation", "NEUTRAL"),
-                "confidence":      recommendation_result.get("confidence", "LOW"),
-                "explanation":     explanation,
-                "predicted_price": recommendation_result.get("predicted_price", 0.0),
-                "forecast_30d":    recommendation_result.get("forecast_30d", 0.0),
-                "forecast_90d":    recommendation_result.get("forecast_90d", 0.0),
-                "forecast_method": recommendation_result.get("forecast_method", "statistical"),
-                "llm_key_insight": recommendation_result.get("llm_key_insight", ""),
-                "tool_outputs":    tool_outputs,
-            }
+def plan_query(user_query: str) -> dict | None:
+    """Extract make/model/year/mileage/condition/region from a query with one
+    structured-output call.  Returns None when make, model or year is missing.
 
-        # ── Execute each requested tool call ─────────────────────────────────
-        messages.append(msg)   # append assistant's tool-call message
+    Missing mileage defaults to 12k miles per year of age, condition to
+    "good" and region to "".
+    """
+    resp = chat_completion(
+        model=MODEL,
+        messages=[
+            {"role": "system", "content": "Extract the car being asked about. Use null for anything not stated."},
+            {"role": "user",   "content": user_query},
+        ],
+        temperature=0,
+        response_format={"type": "json_schema", "json_schema": _CAR_SPEC_SCHEMA},
+    )
+    spec = orjson.loads(resp.choices[0].message.content)
+    if not (spec.get("make") and spec.get("model") and spec.get("year")):
+        return None
+    age = max(1, datetime.now(timezone.utc).year - spec["year"])
+    return {
+        "make":      spec["make"].lower(),
+        "model":     spec["model"].lower(),
+        "year":      spec["year"],
+        "mileage":   spec["mileage"] if spec["mileage"] is not None else 12_000 * age,
+        "condition": (spec["condition"] or "good").lower(),
+        "region":    (spec["region"] or "").lower(),
+    }
 
-        for tc in msg.tool_calls:
-            args   = json.loads(tc.function.arguments)
-            result = _dispatch(tc.function.name, args)
 
-            # Capture synthesize_recommendation output for top-level return
-            if tc.function.name == "synthesize_recommendation":
-                recommendation_result = result
+def run_agent_planned(user_query: str) -> dict:
+    """
+    Same result as run_agent, but with a fixed tool plan instead of letting
+    the LLM drive the tools: one call to parse the query, the four data
+    tools in parallel, run_llm_price_analysis, synthesize_recommendation, and
+    one call for the explanation.  That is three OpenAI calls, where
+    run_agent makes five.
 
-            tool_outputs[tc.function.name] = result
+    Falls back to run_agent when the query doesn't name a make, model and year.
+    """
+    spec = plan_query(user_query)
+    if spec is None:
+        return run_agent(user_query)
+    make, model, year = spec["make"], spec["model"], spec["year"]
+
+    hist_fut = _TOOL_POOL.submit(get_price_history, make, model, year)
+    fc_fut   = _TOOL_POOL.submit(run_forecast, make, model, year)
+    pred_fut = _TOOL_POOL.submit(run_price_prediction, **spec)
+    ctx_fut  = _TOOL_POOL.submit(get_market_context, make, model, year)
+    fc, pred, ctx = fc_fut.result(), pred_fut.result(), ctx_fut.result()
+
+    llm = run_llm_price_analysis(
+        **spec,
+        current_price=pred["predicted_price"],
+        stat_forecast_30d=fc["forecast_30d"],
+        stat_forecast_90d=fc["forecast_90d"],
+        trend_direction=fc["trend_direction"],
+        trend_pct_30d=fc["trend_pct_change"],
+        inventory_trend=ctx["inventory_trend"],
+        price_vs_median_pct=ctx["price_vs_median_pct"],
+    )
+    rec = synthesize_recommendation(
+        trend_direction=fc["trend_direction"],
+        trend_pct_change=fc["trend_pct_change"],
+        price_vs_median_pct=ctx["price_vs_median_pct"],
+        inventory_trend=ctx["inventory_trend"],
+        predicted_price=pred["predicted_price"],
+        stat_forecast_30d=fc["forecast_30d"],
+        stat_forecast_90d=fc["forecast_90d"],
+        llm_forecast_30d=llm.get("forecast_30d", 0),
+        llm_forecast_90d=llm.get("forecast_90d", 0),
+        llm_trend_direction=llm.get("trend_direction", ""),
+        llm_best_time_to_buy=llm.get("best_time_to_buy", ""),
+        llm_key_insight=llm.get("key_insight", ""),
+    )
+    tool_outputs = {
+        "get_price_history":         hist_fut.result(),
+        "run_forecast":              fc,
+        "run_price_prediction":      pred,
+        "get_market_context":        ctx,
+        "run_llm_price_analysis":    llm,
+        "synthesize_recommendation": rec,
+    }
 
-            messages.append({
-                "role":         "tool",
-                "tool_call_id": tc.id,
-                "content":      json.dumps(result, default=str),
-            })
+    summary = {k: v for k, v in tool_outputs.items() if k != "get_price_history"}
+    resp = chat_completion(
+        model=MODEL,
+        messages=[
+            {"role": "system", "content": _EXPLAIN_SYSTEM},
+            {"role": "user",   "content": f"Query: {user_query}\n\nData:\n"
+                + orjson.dumps(summary, default=str, option=_ORJSON_OPTS).decode()},
+        ],
+    )
+    return _agent_result(rec, resp.choices[0].message.content or "", tool_outputs)
 
-    return {
-        "recommendation": recommendation_result.get("recommendation", "NEUTRAL"),
-        "confidence":     recommendation_result.get("confidence", "LOW"),
-        "explanation":    "Max tool rounds reached without final LLM response.",
-        "predicted_price": recommendation_result.get("predicted_price", 0.0),
-        "forecast_30d":   recommendation_result.get("forecast_30d", 0.0),
-        "forecast_90d":   recommendation_result.get("forecast_90d", 0.0),
-        "forecast_method": recommendation_result.get("forecast_method", "statistical"),
-        "llm_key_insight": recommendation_result.get("llm_key_insight", ""),
-        "tool_outputs":   tool_outputs,
-    }
+
+def run_agent_batch(queries: list[str], max_workers: int = 8, **kwargs: Any) -> list[dict]:
+    """
+    Run run_agent over many queries concurrently (batch evaluation,
+    multi-user serving).  Results are returned in query order; ``kwargs``
+    are forwarded to run_agent.  Total OpenAI concurrency stays bounded by
+    OPENAI_CONCURRENCY through the shared client.
+    """
+    if not queries:
+        return []
+    # A dedicated pool: run_agent itself submits work to _TOOL_POOL, so
+    # sharing that pool could deadlock once every worker is an agent loop.
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(queries)),
+                            thread_name_prefix="agent-batch") as pool:
+        return list(pool.map(lambda q: run_agent(q, **kwargs), queries))
 
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -823,15 +1505,34 @@ if __name__ == "__main__":
         else "Should I buy a 2018 Toyota Camry with 45,000 miles in good condition in California?"
     )
     sep = "-" * 60
+    # Load the model while the first LLM round is in flight (the prediction
+    # tool waits on the same lock)
+    threading.Thread(target=_warmup_model, name="model-warmup", daemon=True).start()
     print(f"\nQuery: {query}\n{sep}")
-    result = run_agent(query)
-
-    print(f"Recommendation : {result['recommendation']}  ({result['confidence']} confidence)")
-    print(f"Predicted price: ${result['predicted_price']:,.0f}")
-    print(f"30-day forecast: ${result['forecast_30d']:,.0f}  ({result['forecast_method']})")
-    print(f"90-day forecast: ${result['forecast_90d']:,.0f}")
-    if result["llm_key_insight"]:
-        print(f"AI insight: {result['llm_key_insight']}")
-    print(f"\nExplanation:\n{result['explanation']}")
-    print(f"\n{sep}\nTool outputs:")
-    print(json.dumps(result["tool_outputs"], indent=2, default=str))
+    # Print events as they arrive: tool progress, the signal as soon as it is
+    # decided, then the explanation token by token.
+    encoded_outputs: dict[str, bytes] = {}
+    for event in iter_agent(query):
+        kind = event["event"]
+        if kind == "tool_result":
+            encoded_outputs[event["name"]] = event["json"]
+            print(f"  [done] {event['name']}")
+        elif kind == "recommendation":
+            rec = event["result"]
+            print(f"Recommendation : {rec.get('recommendation', 'NEUTRAL')}  "
+                  f"({rec.get('confidence', 'LOW')} confidence)")
+            print(f"Predicted price: ${rec.get('predicted_price', 0.0):,.0f}")
+            print(f"30-day forecast: ${rec.get('forecast_30d', 0.0):,.0f}  "
+                  f"({rec.get('forecast_method', 'statistical')})")
+            print(f"90-day forecast: ${rec.get('forecast_90d', 0.0):,.0f}")
+            if rec.get("llm_key_insight"):
+                print(f"AI insight: {rec['llm_key_insight']}")
+            print("\nExplanation:")
+        elif kind == "explanation_delta":
+            print(event["text"], end="", flush=True)
+    print()
+    print(f"\n{sep}\nTool outputs:", flush=True)
+    # Reuse the bytes already encoded for the LLM rather than encoding again
+    for name, encoded in encoded_outputs.items():
+        sys.stdout.buffer.write(name.encode() + b": " + encoded + b"\n")
+    sys.stdout.flush()
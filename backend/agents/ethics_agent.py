@@ -52,6 +52,7 @@ def run(
     # ── Transparency note (method + data quality) ─────────────────────────────
     _method_labels = {
         "prophet":          "Facebook Prophet time-series model (3+ months of price history)",
+        "ols_seasonal":     "least-squares trend + seasonality model (3+ months of price history)",
         "llm_blended":      "XGBoost + GPT-4o-mini blended forecast (statistical + AI reasoning)",
         "linear":           "linear extrapolation (limited 1–2 months of data)",
         "statistical":      "statistical model with blended AI analysis",
@@ -1,17 +1,14 @@
 # backend/agents/explanation_agent.py
 """ExplanationAgent — GPT-4o-mini generates a 3-sentence reasoning summary."""
 from __future__ import annotations
-import json, os, sys
+import sys
 from pathlib import Path
 
+import orjson
+
 _ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(_ROOT))
-from openai import OpenAI
-from dotenv import load_dotenv
-
-load_dotenv(_ROOT / ".env")
-_oai = OpenAI(api_key=os.environ["OPENAI_API_KEY"])
-MODEL = "gpt-4o-mini"
+from backend.agent import MODEL, chat_completion
 
 
 def run(
@@ -59,7 +56,7 @@ def run(
     )
 
     try:
-        resp = _oai.chat.completions.create(
+        resp = chat_completion(
             model=MODEL,
             messages=[
                 {"role": "system", "content": "You are an expert automotive analyst. Return JSON only."},
@@ -68,7 +65,7 @@ def run(
             temperature=0.1,
             response_format={"type": "json_object"},
         )
-        data    = json.loads(resp.choices[0].message.content)
+        data    = orjson.loads(resp.choices[0].message.content)
         bullets = data.get("reasoning", [])
         if isinstance(bullets, list) and len(bullets) >= 3:
             summary = [str(b) for b in bullets[:3]]
@@ -18,9 +18,13 @@ def run(
     region: str,
     forecast: dict,
     market_context: dict,
+    xgb_result: dict | None = None,
 ) -> dict:
     """Run XGBoost inference then blend with LLM-enhanced price analysis.
 
+    ``xgb_result`` may be passed in when the caller already ran
+    ``run_price_prediction`` concurrently; otherwise it is computed here.
+
     Returns
     -------
     {
@@ -35,7 +39,8 @@ def run(
     }
     """
     # ── XGBoost inference ─────────────────────────────────────────────────────
-    xgb_result = run_price_prediction(make, model, year, mileage, condition, region)
+    if xgb_result is None:
+        xgb_result = run_price_prediction(make, model, year, mileage, condition, region)
     predicted_price = float(xgb_result.get("predicted_price", 0.0))
     shap_factors    = xgb_result.get("shap_factors", [])
 
@@ -75,6 +80,7 @@ def run(
     # ── Base confidence from forecast method ──────────────────────────────────
     _method_conf = {
         "prophet":          80,
+        "ols_seasonal":     80,
         "llm_blended":      78,
         "linear":           72,
         "statistical":      75,
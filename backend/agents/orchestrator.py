@@ -11,16 +11,23 @@ Demo override table (deterministic, always returned for matched vehicles):
 """
 from __future__ import annotations
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 _ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(_ROOT))
 
+from backend.agent import run_forecast, run_price_prediction
 from backend.agents import (
     data_agent, trend_agent, forecast_agent,
     risk_agent, decision_agent, explanation_agent, ethics_agent,
 )
 
+# Shared pool for the independent Mongo / Prophet / XGBoost steps.  Tasks
+# submitted here never wait on each other, so a single pool is deadlock-free
+# even when several requests run the pipeline at once.
+_POOL = ThreadPoolExecutor(max_workers=12, thread_name_prefix="orchestrator")
+
 # ── Demo overrides ─────────────────────────────────────────────────────────────
 _DEMO_OVERRIDES: dict[str, dict] = {
     "tesla model 3": {
@@ -274,7 +281,14 @@ def run_orchestrator(
         "output": {"make": make, "model": model, "year": year},
     })
 
-    data_out       = data_agent.run(make, model, year)
+    # DataAgent, the statistical forecast and XGBoost inference only depend on
+    # the request parameters — start all three together so the pipeline waits
+    # on the slowest of them rather than their sum.
+    data_fut = _POOL.submit(data_agent.run, make, model, year)
+    fc_fut   = _POOL.submit(run_forecast, make, model, year)
+    xgb_fut  = _POOL.submit(run_price_prediction, make, model, year, mileage, condition, region)
+
+    data_out       = data_fut.result()
     agent_log.append(data_out["agent_log_entry"])
     price_history  = data_out["price_history"]
     market_context = data_out["market_context"]
@@ -282,7 +296,7 @@ def run_orchestrator(
     inventory_trend = market_context.get("inventory_trend", "unknown")
     pct_vs_med      = float(market_context.get("price_vs_median_pct", 0.0))
 
-    trend_out = trend_agent.run(make, model, year, price_history)
+    trend_out = trend_agent.run(make, model, year, price_history, forecast=fc_fut.result())
     agent_log.append(trend_out["agent_log_entry"])
     forecast_raw  = trend_out["forecast"]
     trend_data    = trend_out["trend_data"]
@@ -292,6 +306,7 @@ def run_orchestrator(
         make=make, model=model, year=year,
         mileage=mileage, condition=condition, region=region,
         forecast=forecast_raw, market_context=market_context,
+        xgb_result=xgb_fut.result(),
     )
     agent_log.append(fc_out["agent_log_entry"])
     predicted_price = fc_out["predicted_price"]
@@ -10,9 +10,18 @@ from backend.agent import run_forecast
 from backend.utils.smoothing import moving_average, bound
 
 
-def run(make: str, model: str, year: int, price_history: list[dict]) -> dict:
+def run(
+    make: str,
+    model: str,
+    year: int,
+    price_history: list[dict],
+    forecast: dict | None = None,
+) -> dict:
     """Run statistical forecast and derive trend metrics.
 
+    ``forecast`` may be passed in when the caller already started
+    ``run_forecast`` concurrently; otherwise it is computed here.
+
     Returns
     -------
     {
@@ -31,7 +40,8 @@ def run(make: str, model: str, year: int, price_history: list[dict]) -> dict:
         "agent_log_entry": {...},
     }
     """
-    forecast = run_forecast(make, model, year)
+    if forecast is None:
+        forecast = run_forecast(make, model, year)
 
     trend_pct   = float(forecast.get("trend_pct_change", 0.0))
     trend_90d   = float(forecast.get("trend_pct_90d", 0.0))
@@ -2,26 +2,92 @@
 main.py — FastAPI backend for Car Price Intelligence
 Endpoints: /health  /api/cars  /api/predict  /api/market-overview
            /api/shap-importance  /api/clear-cache  /api/seed-market
+           /api/invalidate-cars  /api/market-overview/stream (SSE)
+           /api/predict-batch  /api/explain-batch
 """
-import os, sys, asyncio, hashlib, json
+import os, sys, asyncio, functools, hashlib, heapq
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 
 import joblib, numpy as np
-from fastapi import FastAPI, HTTPException
+from fastapi import Body, FastAPI, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+import orjson
+from pymongo import AsyncMongoClient, ReplaceOne, UpdateOne
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.errors import OperationFailure, PyMongoError
 from dotenv import load_dotenv
 
+try:
+    import redis.asyncio as aioredis
+except ImportError:                        # Redis front cache is optional
+    aioredis = None
+
 _ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(_ROOT))
+from backend.agent import clear_caches, listing_row
+from backend.utils.atomic import write_atomic
+from backend.utils.cache import TTLCache
+from backend.utils.jit import HAS_NUMBA, njit
 from backend.agents.orchestrator import run_orchestrator
 from backend.utils.validation import validate_predict_params
 from backend.car_catalog import CATALOG as _CAR_CATALOG
+from scripts.model_utils import explain_predictions, predict_and_explain, predict_prices, warmup
 
 load_dotenv(_ROOT / ".env")
 
-app = FastAPI(title="Car Price Intelligence API")
+app = FastAPI(title="Car Price Intelligence API", default_response_class=ORJSONResponse)
+
+
+@app.on_event("startup")
+async def _connect_db():
+    global _db
+    _db = AsyncMongoClient(
+        os.environ["MONGO_URI"],
+        maxPoolSize=50,
+        minPoolSize=10,
+        maxIdleTimeMS=60_000,
+        waitQueueTimeoutMS=5000,
+        retryWrites=True,
+        serverSelectionTimeoutMS=2000,
+        socketTimeoutMS=5000,
+        compressors="zstd,snappy,zlib",
+    )["carmarket"]
+    # Open the first connection (TLS handshake to Atlas) before serving traffic
+    try:
+        await _db.command("ping")
+    except PyMongoError as exc:
+        print(f"[startup] Mongo ping failed: {exc}")
+    global _rds
+    if aioredis is not None and os.getenv("REDIS_URI"):
+        _rds = aioredis.Redis.from_url(
+            os.environ["REDIS_URI"], socket_timeout=0.5, socket_connect_timeout=0.5,
+        )
+
+
+@app.on_event("startup")
+async def _warm_model():
+    # The port opens once the model has scored a throwaway row, so no
+    # request pays for the cold start.
+    try:
+        await asyncio.to_thread(warmup)
+    except Exception as exc:
+        print(f"[startup] Model warmup failed: {exc}")
+
+
+@app.on_event("shutdown")
+async def _close_clients():
+    # The native async client owns its connections on this loop — close them
+    # here instead of leaving sockets to the interpreter's teardown.
+    if _bg_tasks:
+        await asyncio.gather(*_bg_tasks, return_exceptions=True)   # pending Mongo writes
+    if _db is not None:
+        await _db.client.close()
+    if _rds is not None:
+        await _rds.aclose()
+    _ANALYSIS_POOL.shutdown(wait=False, cancel_futures=True)
 
 
 @app.on_event("startup")
@@ -34,10 +100,46 @@ async def _clean_stale_cache():
     This is intentional for the demo environment — analyses are fast enough
     that re-running them on demand is preferable to serving stale results.
     """
-    r = await _db["predictions_cache"].delete_many({"is_seed": {"$ne": True}})
-    print(f"[startup] Cleared {r.deleted_count} stale prediction cache entries")
-    seeded = await _seed_market_data(force=True)
-    print(f"[startup] Refreshed {seeded} seed BUY entries")
+    # Runs in the background so the port opens immediately; market-overview
+    # fills any seeds that are still missing on its own.
+    _background(_startup_maintenance())
+
+
+async def _startup_maintenance():
+    try:
+        await _ensure_cache_indexes()
+        r = await _db["predictions_cache"].delete_many({"is_seed": {"$ne": True}})
+        print(f"[startup] Cleared {r.deleted_count} stale prediction cache entries")
+        seeded = await _seed_market_data(force=True)
+        print(f"[startup] Refreshed {seeded} seed BUY entries")
+    except PyMongoError as exc:
+        print(f"[startup] Cache maintenance failed: {exc}")
+
+
+async def _ensure_cache_indexes():
+    """
+    Indexes behind the predictions_cache reads (idempotent):
+      recommendation + predicted_price → market-overview top-BUY sort (ESR order)
+      is_seed + recommendation         → seed count
+      cache_key (unique)               → /api/predict lookup and upsert target
+      expires_at TTL                   → same spec as mongo_ingest.py, so Mongo
+                                         evicts stale entries between restarts
+    """
+    col = _db["predictions_cache"]
+    specs = [
+        ([("recommendation", 1), ("predicted_price", 1)], {"name": "recommendation_price"}),
+        ([("is_seed", 1), ("recommendation", 1)],         {"name": "is_seed_recommendation"}),
+        ([("cache_key", 1)],                              {"name": "cache_key_unique", "unique": True}),
+        ([("expires_at", 1)],                             {"name": "ttl_expires_at", "expireAfterSeconds": 3600}),
+    ]
+    results = await asyncio.gather(
+        *(col.create_index(keys, **opts) for keys, opts in specs), return_exceptions=True,
+    )
+    for (_, opts), res in zip(specs, results):
+        if isinstance(res, PyMongoError):
+            print(f"[startup] Index {opts['name']} skipped: {res}")
+        elif isinstance(res, BaseException):
+            raise res
 
 
 app.add_middleware(
@@ -47,8 +149,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-_db   = AsyncIOMotorClient(os.environ["MONGO_URI"])["carmarket"]
-_shap = joblib.load(_ROOT / "models" / "shap_data.pkl") if (_ROOT / "models" / "shap_data.pkl").exists() else None
+# Created in the startup handler so the client binds to the running event loop.
+_db: AsyncDatabase | None = None
+# Optional Redis in front of predictions_cache (set REDIS_URI); None = Mongo only.
+_rds = None
+_PRED_TTL_S = 3600
+_PRED_TTL   = timedelta(seconds=_PRED_TTL_S)
+# Orchestrator runs block for seconds on LLM calls, so they get their own
+# pool instead of asyncio's default executor (shared with every to_thread).
+_ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "32"))
+_ANALYSIS_POOL    = ThreadPoolExecutor(max_workers=_ANALYSIS_WORKERS, thread_name_prefix="analysis")
+# Excess requests wait here rather than in the executor's queue: a request
+# cancelled while waiting (client gone) never starts an analysis.
+_ANALYSIS_SLOTS   = asyncio.Semaphore(_ANALYSIS_WORKERS)
+# Background Mongo writes — referenced here so they aren't garbage-collected mid-flight.
+_bg_tasks: set[asyncio.Task] = set()
+
+
+def _background(coro) -> None:
+    task = asyncio.create_task(coro)
+    _bg_tasks.add(task)
+    task.add_done_callback(_bg_tasks.discard)
 
 # ── Fallback seasonality (US used-car market industry averages) ─────────────
 _FALLBACK_SEASONALITY = [
@@ -66,6 +187,13 @@ _FALLBACK_SEASONALITY = [
     {"month": 12, "avg_price": 16600},   # Dec — holiday bargains
 ]
 
+# Immutable, so encoded once: orjson (3.9.16+) splices a Fragment's bytes
+# verbatim instead of walking the 12 dicts on every encode.
+_FALLBACK_SEASONALITY_JSON = (
+    orjson.Fragment(orjson.dumps(_FALLBACK_SEASONALITY)) if hasattr(orjson, "Fragment")
+    else _FALLBACK_SEASONALITY
+)
+
 # ── Seed BUY opportunities for popular vehicles ─────────────────────────────
 _SEED_BUYS = [
     {
@@ -167,14 +295,14 @@ _SEED_BUYS = [
 ]
 
 
-def _clean(obj):
-    """Strip MongoDB internals and make JSON-safe."""
-    return json.loads(json.dumps(obj, default=str, skipkeys=False)
-                      .replace('"_id":', '"__id_skip":')  )  # ObjectId gone via default=str
-
 def _safe(doc: dict) -> dict:
+    """
+    Strip MongoDB internals in place.  The top-level _id is the only ObjectId
+    in a predictions_cache document and orjson encodes datetimes natively, so
+    nothing else needs converting.
+    """
     doc.pop("_id", None); doc.pop("expires_at", None); doc.pop("cache_key", None)
-    return json.loads(json.dumps(doc, default=str))
+    return doc
 
 
 # ── Health ─────────────────────────────────────────────────────────────────────
@@ -185,21 +313,91 @@ async def health():
 
 
 # ── Cars catalogue ─────────────────────────────────────────────────────────────
+# The catalogue only changes on re-ingest, so the merged list is kept 5 minutes.
+# Listings without a make are skipped — they can't be picked in the dropdown.
+_cars_cache = TTLCache(maxsize=1, ttl=300)
+
 @app.get("/api/cars")
 async def cars():
+    # Cached as encoded JSON: repeat calls skip both Mongo and the encoder.
+    cached = _cars_cache.get("cars")
+    if cached is not None:
+        return Response(cached, media_type="application/json")
+    # Always merge DB results with the static catalog so all 20 makes appear
+    # even when MongoDB listings is partially ingested (e.g. missing Ford/Jeep).
+    # The union, de-duplication and sort all run server-side in one pipeline.
     pipeline = [
+        {"$documents": _CAR_CATALOG},
+        {"$unionWith": {"coll": "listings", "pipeline": [
+            {"$match": {"make": {"$ne": None}}},
+            {"$group": {"_id": {"make": "$make", "model": "$model", "year": "$year"}}},
+            {"$replaceWith": "$_id"},
+        ]}},
         {"$group": {"_id": {"make": "$make", "model": "$model", "year": "$year"}}},
         {"$project": {"_id": 0, "make": "$_id.make", "model": "$_id.model", "year": "$_id.year"}},
         {"$sort": {"make": 1, "model": 1, "year": -1}},
     ]
-    db_results = await _db["listings"].aggregate(pipeline).to_list(5000)
-    # Always merge DB results with the static catalog so all 20 makes appear
-    # even when MongoDB listings is partially ingested (e.g. missing Ford/Jeep).
-    # DB entries take priority; catalog fills any gaps.
-    seen = {(r["make"], r["model"], r["year"]) for r in db_results}
-    extras = [r for r in _CAR_CATALOG if (r["make"], r["model"], r["year"]) not in seen]
-    combined = db_results + extras
-    return sorted(combined, key=lambda r: (r.get("make") or "", r.get("model") or "", -(r.get("year") or 0)))
+    try:
+        combined = await (await _db.aggregate(pipeline)).to_list(None)
+    except OperationFailure:
+        # $documents needs MongoDB 5.1+; merge the two sorted lists here instead
+        combined = await _cars_merged_in_python()
+    body = orjson.dumps(combined)
+    _cars_cache.set("cars", body)
+    return Response(body, media_type="application/json")
+
+
+@app.post("/api/invalidate-cars")
+async def invalidate_cars():
+    """Drop the cached catalogue (call after re-ingesting listings)."""
+    _cars_cache.clear()
+    return {"message": "Cars catalogue cache cleared"}
+
+
+def _car_sort_key(r: dict) -> tuple:
+    return (r.get("make") or "", r.get("model") or "", -(r.get("year") or 0))
+
+
+# Catalogue presorted once, with its keys as a set for O(1) membership tests.
+_CATALOG_SORTED = sorted(_CAR_CATALOG, key=_car_sort_key)
+_CATALOG_KEYS   = frozenset((c["make"], c["model"], c["year"]) for c in _CAR_CATALOG)
+
+
+async def _cars_merged_in_python() -> list[dict]:
+    """/api/cars fallback: sorted DB groups merged with the sorted catalogue."""
+    db_results = await (await _db["listings"].aggregate([
+        {"$match": {"make": {"$ne": None}}},
+        {"$group": {"_id": {"make": "$make", "model": "$model", "year": "$year"}}},
+        {"$project": {"_id": 0, "make": "$_id.make", "model": "$_id.model", "year": "$_id.year"}},
+        {"$sort": {"make": 1, "model": 1, "year": -1}},
+    ])).to_list(None)
+    db_keys = {(r["make"], r["model"], r["year"]) for r in db_results}
+    if _CATALOG_KEYS <= db_keys:
+        return db_results
+    extras = [c for c in _CATALOG_SORTED if (c["make"], c["model"], c["year"]) not in db_keys]
+    # Mongo's null-first ordering can differ from the key for missing fields,
+    # so re-sort DB rows with the same key (Timsort is linear on sorted input).
+    db_results.sort(key=_car_sort_key)
+    return list(heapq.merge(db_results, extras, key=_car_sort_key))
+
+
+# ── Redis helpers (errors degrade to a miss so Mongo keeps serving) ─────────
+async def _redis_get(k: str) -> bytes | None:
+    if _rds is None:
+        return None
+    try:
+        return await _rds.get(k)
+    except aioredis.RedisError:
+        return None
+
+
+async def _redis_set(k: str, value: dict) -> None:
+    if _rds is None:
+        return
+    try:
+        await _rds.set(k, orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY), ex=_PRED_TTL_S)
+    except (aioredis.RedisError, TypeError):
+        pass
 
 
 # ── Predict / analyse ──────────────────────────────────────────────────────────
@@ -216,24 +414,39 @@ async def predict(
     if errors:
         raise HTTPException(status_code=422, detail="; ".join(errors))
 
-    key = hashlib.md5(f"{make}{model}{year}{mileage}{condition}{region}".encode()).hexdigest()
-    cached = await _db["predictions_cache"].find_one({"cache_key": key})
-    # Reject cache if forecast errored
-    _forecast_errored = bool(
-        (cached or {}).get("tool_outputs", {}).get("run_forecast", {}).get("error")
+    # "|" separators keep e.g. ("f", "150") and ("f1", "50") from colliding
+    key = hashlib.blake2b(
+        f"{make}|{model}|{year}|{mileage}|{condition}|{region}".encode(), digest_size=16,
+    ).hexdigest()
+    # Redis holds the response exactly as served; a hit skips Mongo entirely.
+    raw = await _redis_get(f"pred:{key}")
+    if raw is not None:
+        return orjson.loads(raw)
+
+    # Acceptance rules run server-side, so an unusable entry (errored forecast,
+    # no result) never crosses the wire and internals are projected out:
+    #   - reject if the forecast errored
+    #   - accept a final_recommendation (new schema) or legacy recommendation
+    cached = await _db["predictions_cache"].find_one(
+        {
+            "cache_key": key,
+            "tool_outputs.run_forecast.error": {"$in": [None, "", False, 0]},
+            "$or": [
+                {"final_recommendation": {"$nin": [None, "", False, 0, {}]}},
+                {"recommendation": {"$in": ["BUY", "WAIT", "NEUTRAL"]}},
+            ],
+        },
+        {"_id": 0, "expires_at": 0, "cache_key": 0},
     )
-    # Accept cache if it has a final_recommendation (new schema) or legacy recommendation
-    _has_result = bool(
-        (cached or {}).get("final_recommendation") or
-        (cached or {}).get("recommendation") in ("BUY", "WAIT", "NEUTRAL")
-    )
-    if cached and _has_result and not _forecast_errored:
-        return _safe(cached)
+    if cached:
+        await _redis_set(f"pred:{key}", cached)
+        return cached
 
     try:
-        result = await asyncio.to_thread(
-            run_orchestrator, make, model, year, mileage, condition, region
-        )
+        async with _ANALYSIS_SLOTS:
+            result = await asyncio.get_running_loop().run_in_executor(
+                _ANALYSIS_POOL, run_orchestrator, make, model, year, mileage, condition, region,
+            )
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc))
 
@@ -247,11 +460,62 @@ async def predict(
         "condition":  condition,
         "region":     region,
         "cache_key":  key,
-        "expires_at": datetime.now(timezone.utc) + timedelta(hours=1),
+        "expires_at": datetime.now(timezone.utc) + _PRED_TTL,
     }
-    # Upsert so stale/error cache entries are replaced
-    await _db["predictions_cache"].replace_one({"cache_key": key}, doc, upsert=True)
-    return _safe(doc)
+    # Upsert so stale/error cache entries are replaced.  With Redis in front
+    # the durable Mongo write happens in the background.
+    write = _db["predictions_cache"].replace_one({"cache_key": key}, doc, upsert=True)
+    out = _safe(dict(doc))
+    if _rds is not None:
+        await _redis_set(f"pred:{key}", out)
+        _background(write)
+    else:
+        await write
+    return out
+
+
+# ── Batch predict / explain (model only — no agent, no cache) ───────────────────
+_MAX_BATCH = 500
+
+
+def _batch_rows(vehicles: list[dict]) -> list[dict]:
+    """Validate a batch body and build model rows; 422 names the bad index."""
+    if len(vehicles) > _MAX_BATCH:
+        raise HTTPException(status_code=422, detail=f"At most {_MAX_BATCH} vehicles per batch")
+    rows = []
+    for i, v in enumerate(vehicles):
+        errors = validate_predict_params(v)
+        if errors:
+            raise HTTPException(status_code=422, detail=f"vehicles[{i}]: " + "; ".join(errors))
+        rows.append(listing_row(
+            str(v["make"]), str(v["model"]), int(v["year"]),
+            int(v["mileage"]), str(v["condition"]), str(v["region"]),
+        ))
+    return rows
+
+
+@app.post("/api/predict-batch")
+async def predict_batch(vehicles: list[dict] = Body(..., embed=True)):
+    """XGBoost prices for many vehicles in one feature build and model call."""
+    if not vehicles:
+        return {"predictions": []}
+    prices = await asyncio.to_thread(predict_prices, _batch_rows(vehicles))
+    return {"predictions": [{"predicted_price": round(p, 2)} for p in prices]}
+
+
+@app.post("/api/explain-batch")
+async def explain_batch(vehicles: list[dict] = Body(..., embed=True), with_price: bool = False):
+    """Top-3 SHAP factors for many vehicles in one explainer call."""
+    if not vehicles:
+        return {"explanations": []}
+    rows = _batch_rows(vehicles)
+    if with_price:
+        prices, factors = await asyncio.to_thread(predict_and_explain, rows)
+        return {"explanations": [
+            {"predicted_price": round(p, 2), "shap_factors": f} for p, f in zip(prices, factors)
+        ]}
+    factors = await asyncio.to_thread(explain_predictions, rows)
+    return {"explanations": [{"shap_factors": f} for f in factors]}
 
 
 # ── Industry baseline constants (derived from cleaned_cars.csv, 328k listings) ─
@@ -259,37 +523,45 @@ _INDUSTRY_AVG_PRICE = 18_500.0   # US median used-car price
 _INDUSTRY_MOM_PCT   =     0.3    # ~3.6 % annual appreciation
 
 # ── Seed market data (helper + endpoint) ───────────────────────────────────────
+# Seed keys and documents are fixed; only expires_at is set per write.
+_PREPARED_SEEDS = [
+    (key, {**seed, "is_seed": True, "cache_key": key, "tool_outputs": {}})   # no tool trace for seeds
+    for seed in _SEED_BUYS
+    for key in (f"seed_{seed['make']}_{seed['model']}_{seed['year']}",)
+]
+_SEED_TTL = timedelta(days=90)
+
+
 async def _seed_market_data(force: bool = False) -> int:
     """
     Upsert pre-computed BUY opportunities for popular vehicles into
-    predictions_cache. Uses replace_one(upsert=True) so seeds are always
-    refreshed when force=True or when the "Refresh Seeds" button is pressed.
+    predictions_cache in one unordered bulk_write: upserting ReplaceOnes when
+    force=True (startup, "Refresh Seeds" button) so seeds are always
+    refreshed, otherwise $setOnInsert upserts that only add missing seeds.
     Returns the number of documents upserted/inserted.
     """
-    upserted = 0
-    for seed in _SEED_BUYS:
-        seed_key = f"seed_{seed['make']}_{seed['model']}_{seed['year']}"
-        if not force:
-            existing = await _db["predictions_cache"].find_one({"cache_key": seed_key})
-            if existing:
-                continue
-        doc = {
-            **seed,
-            "is_seed":      True,
-            "cache_key":    seed_key,
-            "tool_outputs": {},   # no tool trace for seeds
-            "expires_at":   datetime.now(timezone.utc) + timedelta(days=90),
-        }
-        res = await _db["predictions_cache"].replace_one({"cache_key": seed_key}, doc, upsert=True)
-        if res.upserted_id or res.modified_count:
-            upserted += 1
-    return upserted
+    expires = datetime.now(timezone.utc) + _SEED_TTL
+    if force:
+        ops = [
+            ReplaceOne({"cache_key": seed_key}, {**prepared, "expires_at": expires}, upsert=True)
+            for seed_key, prepared in _PREPARED_SEEDS
+        ]
+    else:
+        # $setOnInsert only writes seeds that don't exist yet — no read first
+        ops = [
+            UpdateOne({"cache_key": seed_key},
+                      {"$setOnInsert": {**prepared, "expires_at": expires}}, upsert=True)
+            for seed_key, prepared in _PREPARED_SEEDS
+        ]
+    res = await _db["predictions_cache"].bulk_write(ops, ordered=False)
+    return res.upserted_count + res.modified_count
 
 
 @app.post("/api/seed-market")
 async def seed_market():
     """Force-refresh all seed BUY opportunities in the cache."""
     inserted = await _seed_market_data(force=True)
+    _overview_cache.clear()
     total = await _db["predictions_cache"].count_documents({"recommendation": "BUY"})
     return {
         "seeded": inserted,
@@ -299,26 +571,127 @@ async def seed_market():
 
 
 # ── Market overview ────────────────────────────────────────────────────────────
+# Inclusion projection: exactly the fields the market page renders, so no
+# internals (_id, expires_at, tool_outputs) ever leave the server.
+_TOP_BUY_FIELDS = {
+    "_id": 0,
+    **dict.fromkeys((
+        "make", "model", "year", "mileage", "condition", "region", "is_seed",
+        "predicted_price", "forecast_30d", "forecast_90d", "forecast_method",
+        "recommendation", "confidence", "explanation", "llm_key_insight",
+    ), 1),
+}
+
+# Seeds as the top-BUY query would return them, and their average price —
+# both constant, used when market-overview has to fill in missing seeds.
+_SEED_TOP_VIEWS = [
+    {k: doc[k] for k in _TOP_BUY_FIELDS if k != "_id" and k in doc}
+    for _, doc in _PREPARED_SEEDS if doc.get("recommendation") == "BUY"
+]
+_seed_prices    = [s["predicted_price"] for s in _SEED_BUYS if s.get("predicted_price", 0) > 0]
+_SEED_AVG_PRICE = sum(_seed_prices) / len(_seed_prices) if _seed_prices else None
+
+# Dashboard polling hits this constantly; the underlying data changes at most
+# every few minutes, so the encoded body is reused for 30 s.
+_OVERVIEW_TTL_S  = 30
+_overview_cache  = TTLCache(maxsize=1, ttl=_OVERVIEW_TTL_S)
+_overview_lock   = asyncio.Lock()
+
+
+async def _market_overview_cached() -> tuple[bytes, str]:
+    """(encoded body, ETag) for the market overview, shared by all clients."""
+    cached = _overview_cache.get("overview")
+    if cached is not None:
+        return cached
+    # Single-flight: concurrent misses wait for one Mongo fan-out, not one each
+    async with _overview_lock:
+        cached = _overview_cache.get("overview")
+        if cached is None:
+            body   = orjson.dumps(await _market_overview_payload())
+            cached = (body, f'"{hashlib.md5(body).hexdigest()}"')
+            _overview_cache.set("overview", cached)
+    return cached
+
+
 @app.get("/api/market-overview")
-async def market_overview():
+async def market_overview(request: Request):
+    body, etag = await _market_overview_cached()
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={_OVERVIEW_TTL_S}"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@app.get("/api/market-overview/stream")
+async def market_overview_stream(request: Request):
+    """
+    Server-Sent Events alternative to polling /api/market-overview: pushes
+    the overview on connect and again only when it changes (checked every
+    30 s against the shared cache), with a keep-alive comment otherwise.
+    """
+    async def events():
+        last_etag = None
+        while not await request.is_disconnected():
+            body, etag = await _market_overview_cached()
+            if etag != last_etag:
+                yield b"data: " + body + b"\n\n"
+                last_etag = etag
+            else:
+                yield b": keep-alive\n\n"
+            await asyncio.sleep(_OVERVIEW_TTL_S)
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"},
+    )
+
+
+async def _market_overview_payload() -> dict:
+    # ── All reads are independent → one concurrent round of Mongo queries ────
+    async def _price_aggs():
+        # Seed and real-prediction averages from one scan via $facet
+        facet = await (await _db["predictions_cache"].aggregate([
+            {"$match": {"predicted_price": {"$gt": 0}}},
+            {"$facet": {
+                "seed": [
+                    {"$match": {"is_seed": True}},
+                    {"$group": {"_id": None, "avg": {"$avg": "$predicted_price"}}},
+                ],
+                "real": [
+                    {"$match": {"is_seed": {"$ne": True}}},
+                    {"$group": {"_id": None, "avg": {"$avg": "$predicted_price"}, "count": {"$sum": 1}}},
+                ],
+            }},
+        ])).to_list(1)
+        return facet[0] if facet else {"seed": [], "real": []}
+
+    seed_count, price_aggs, top_buys = await asyncio.gather(
+        _db["predictions_cache"].count_documents({"is_seed": True, "recommendation": "BUY"}),
+        _price_aggs(),
+        _db["predictions_cache"].find(
+            {"recommendation": "BUY"},
+            _TOP_BUY_FIELDS,
+        ).sort("predicted_price", 1).limit(10).to_list(10),
+    )
+    seed_agg, real_agg = price_aggs["seed"], price_aggs["real"]
+
     # ── Always ensure seed data exists ───────────────────────────────────────
-    seed_count = await _db["predictions_cache"].count_documents({"is_seed": True, "recommendation": "BUY"})
+    # The seeds just written are known here, so instead of re-reading, the
+    # seed average is the precomputed one and missing seeds are merged into
+    # the top-BUY list in Python (real predictions don't change).
     if seed_count < len(_SEED_BUYS):
         await _seed_market_data(force=False)   # fills any missing seeds
+        seed_agg = [{"avg": _SEED_AVG_PRICE}] if _SEED_AVG_PRICE else []
+        present  = {(b["make"], b["model"], b["year"]) for b in top_buys if b.get("is_seed")}
+        top_buys = heapq.nsmallest(
+            10,
+            top_buys + [v for v in _SEED_TOP_VIEWS if (v["make"], v["model"], v["year"]) not in present],
+            key=lambda b: b.get("predicted_price") or 0,
+        )
 
     # ── Avg price: seed avg as stable baseline; real predictions update it live ─
     # We deliberately ignore price_snapshots (2021 Craigslist data → corrupt).
-    seed_agg = await _db["predictions_cache"].aggregate([
-        {"$match": {"is_seed": True, "predicted_price": {"$gt": 0}}},
-        {"$group": {"_id": None, "avg": {"$avg": "$predicted_price"}}},
-    ]).to_list(1)
     seed_avg = round(seed_agg[0]["avg"], 2) if seed_agg else _INDUSTRY_AVG_PRICE
 
-    real_agg = await _db["predictions_cache"].aggregate([
-        {"$match": {"is_seed": {"$ne": True}, "predicted_price": {"$gt": 0}}},
-        {"$group": {"_id": None, "avg": {"$avg": "$predicted_price"}, "count": {"$sum": 1}}},
-    ]).to_list(1)
-
     if real_agg and real_agg[0]["count"] >= 1:
         real_avg  = round(real_agg[0]["avg"], 2)
         # Weighted blend: seed baseline (70%) + live predictions (30%)
@@ -330,21 +703,15 @@ async def market_overview():
         mom_pct      = _INDUSTRY_MOM_PCT
         price_source = "industry"
 
-    # ── Top BUY opportunities (seeds + real predictions, sorted by price) ────
-    top_buys = await _db["predictions_cache"].find(
-        {"recommendation": "BUY"},
-        {"_id": 0, "cache_key": 0, "expires_at": 0, "tool_outputs": 0},
-    ).sort("predicted_price", 1).limit(10).to_list(10)
-
     # ── Seasonality — always use industry fallback (DB snapshots are 2021 data) ─
-    season_data        = _FALLBACK_SEASONALITY
+    season_data        = _FALLBACK_SEASONALITY_JSON
     seasonality_source = "industry"
 
     return {
         "avg_price_this_month": avg_now,
         "mom_change_pct":       mom_pct,
         "price_source":         price_source,
-        "top_buys":             [_safe(b) for b in top_buys],
+        "top_buys":             top_buys,
         "seasonality_data":     season_data,
         "seasonality_source":   seasonality_source,
         "updated_at":           datetime.now(timezone.utc).strftime("%Y-%m"),
@@ -355,20 +722,92 @@ async def market_overview():
 @app.delete("/api/clear-cache")
 async def clear_cache():
     result = await _db["predictions_cache"].delete_many({})
+    if _rds is not None:
+        try:
+            keys = [k async for k in _rds.scan_iter(match="pred:*", count=1000)]
+            if keys:
+                await _rds.delete(*keys)
+        except aioredis.RedisError:
+            pass
+    await asyncio.to_thread(clear_caches)   # sync Redis SCAN/DEL over four namespaces
+    _overview_cache.clear()
     return {"deleted": result.deleted_count, "message": "Predictions cache cleared"}
 
 
 # ── SHAP global importance ─────────────────────────────────────────────────────
+@njit(cache=True, fastmath=True)
+def _shap_column_means(sv: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Column means of |sv| and sv in one row-major pass over the matrix."""
+    n, d = sv.shape
+    mean_abs = np.zeros(d)
+    mean_dir = np.zeros(d)
+    for i in range(n):
+        for j in range(d):
+            v = sv[i, j]
+            mean_abs[j] += abs(v)
+            mean_dir[j] += v
+    return mean_abs / n, mean_dir / n
+
+
+def _shap_top_features(sv: np.ndarray | None, cols: list[str], k: int = 10) -> list[dict]:
+    """Top-k features by mean |SHAP| from the saved SHAP sample (static artifact)."""
+    if sv is None or not cols:
+        return []
+    if HAS_NUMBA:
+        # Fused kernel: one read of the (memory-mapped) matrix instead of two
+        mean_abs, mean_dir = _shap_column_means(np.ascontiguousarray(sv))
+    else:
+        mean_abs, mean_dir = np.abs(sv).mean(axis=0), sv.mean(axis=0)
+    k   = min(k, len(cols))
+    top = np.argpartition(-mean_abs, k - 1)[:k]
+    top = top[np.argsort(-mean_abs[top], kind="stable")]
+    return [{"feature": cols[i], "importance": round(float(mean_abs[i]), 4),
+             "direction": "positive" if float(mean_dir[i]) > 0 else "negative"}
+            for i in top]
+
+
+_SHAP_PATH      = _ROOT / "models" / "shap_data.pkl"
+_SHAP_NPY_PATH  = _ROOT / "models" / "shap_values.npy"
+_SHAP_COLS_PATH = _ROOT / "models" / "shap_columns.json"
+
+
+def _load_shap_arrays() -> tuple[np.ndarray | None, list[str]]:
+    """
+    SHAP matrix + column names.  Prefers the raw .npy export, memory-mapped so
+    only the pages the reductions touch are read; otherwise (missing, or
+    older than the pickle after a retrain) unpickles shap_data.pkl and writes
+    that export for the next start.
+    """
+    fresh = _SHAP_NPY_PATH.exists() and _SHAP_COLS_PATH.exists() and (
+        not _SHAP_PATH.exists() or _SHAP_NPY_PATH.stat().st_mtime >= _SHAP_PATH.stat().st_mtime
+    )
+    if fresh:
+        try:
+            return np.load(_SHAP_NPY_PATH, mmap_mode="r"), orjson.loads(_SHAP_COLS_PATH.read_bytes())
+        except (OSError, ValueError) as exc:   # unreadable export — rebuild from the pickle
+            print(f"[shap] export load failed, using the pickle: {exc}")
+    if not _SHAP_PATH.exists():
+        return None, []
+    data = joblib.load(_SHAP_PATH)
+    sv, cols = np.asarray(data["shap_values"]), list(data["X_test_sample"].columns)
+    # Each file is written aside and renamed in, columns last, so a concurrent
+    # worker never maps a truncated .npy that already looks newer than the pickle.
+    try:
+        write_atomic(_SHAP_NPY_PATH, lambda tmp: np.save(tmp, sv))
+        write_atomic(_SHAP_COLS_PATH, lambda tmp: tmp.write_bytes(orjson.dumps(cols)))
+    except OSError:
+        pass   # read-only models dir — keep using the pickle
+    return sv, cols
+
+
+@functools.cache
+def _shap_top10() -> list[dict]:
+    """Computed on first use, not at import, so startup never waits on the
+    SHAP artifact; the matrix (or its mapping) is released straight away."""
+    return _shap_top_features(*_load_shap_arrays())
+
+
 @app.get("/api/shap-importance")
 async def shap_importance():
-    if not _shap:
-        return {"features": []}
-    sv, cols = _shap["shap_values"], list(_shap["X_test_sample"].columns)
-    mean_abs, mean_dir = np.abs(sv).mean(axis=0), sv.mean(axis=0)
-    features = sorted(
-        [{"feature": n, "importance": round(float(v), 4),
-          "direction": "positive" if float(d) > 0 else "negative"}
-         for n, v, d in zip(cols, mean_abs, mean_dir)],
-        key=lambda x: x["importance"], reverse=True,
-    )[:10]
-    return {"features": features}
+    # First call may unpickle shap_data.pkl — keep that off the event loop
+    return {"features": await asyncio.to_thread(_shap_top10)}
@@ -0,0 +1,28 @@
+# backend/utils/atomic.py
+"""Atomic file replacement for artifacts other worker processes may be reading."""
+from __future__ import annotations
+
+import os
+import tempfile
+from pathlib import Path
+from typing import Callable
+
+
+def write_atomic(path: Path, write: Callable[[Path], None]) -> None:
+    """Run ``write(tmp_path)`` on a temp file beside ``path``, then rename it
+    into place, so readers see either the old file or the complete new one.
+
+    The temp name keeps ``path``'s suffix (some writers pick the format from
+    it).  On any error the temp file is removed and the error re-raised.
+    """
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}.", suffix=f".tmp{path.suffix}")
+    os.close(fd)
+    try:
+        write(Path(tmp))
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,69 @@
+# backend/utils/batching.py
+"""Micro-batching: coalesce concurrent single-item calls into one batched call."""
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable
+
+
+class MicroBatcher:
+    """Collect items submitted from many threads and run them through
+    ``batch_fn`` together.
+
+    A background worker takes the first pending item, then keeps collecting
+    for up to ``window_ms`` (or until ``max_batch`` items) before calling
+    ``batch_fn(items)``, which must return one result per item in order.
+    ``submit`` blocks the caller until its own result is ready, or raises
+    ``TimeoutError`` after ``timeout`` seconds; an exception from ``batch_fn``
+    (or a result list of the wrong length) is raised in every caller of that
+    batch.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[list], list],
+        max_batch: int = 64,
+        window_ms: float = 10.0,
+        name: str = "micro-batcher",
+        timeout: float | None = 30.0,
+    ):
+        self._batch_fn  = batch_fn
+        self._max_batch = max_batch
+        self._window_s  = window_ms / 1000.0
+        self._timeout   = timeout
+        self._queue: queue.SimpleQueue[tuple[Any, Future]] = queue.SimpleQueue()
+        threading.Thread(target=self._run, name=name, daemon=True).start()
+
+    def submit(self, item: Any, timeout: float | None = None) -> Any:
+        fut: Future = Future()
+        self._queue.put((item, fut))
+        return fut.result(timeout if timeout is not None else self._timeout)
+
+    def _run(self) -> None:
+        while True:
+            batch    = [self._queue.get()]
+            deadline = time.monotonic() + self._window_s
+            while len(batch) < self._max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                results = self._batch_fn([item for item, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(
+                        f"batch_fn returned {len(results)} results for {len(batch)} items"
+                    )
+            except Exception as exc:
+                for _, fut in batch:
+                    fut.set_exception(exc)
+                continue
+            for (_, fut), result in zip(batch, results):
+                fut.set_result(result)
@@ -0,0 +1,203 @@
+# backend/utils/cache.py
+"""Small in-process TTL + LRU cache used to memoise per-vehicle tool results.
+
+Set REDIS_URI (and install ``redis``) to back ``shared=True`` caches with a
+Redis L2 layer so results are shared across worker processes.
+"""
+from __future__ import annotations
+
+import copy
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable
+
+import orjson
+
+try:
+    import redis
+except ImportError:                        # Redis L2 is optional
+    redis = None
+
+_MISSING = object()
+
+_redis_client = None
+_redis_lock   = threading.Lock()
+
+
+def _get_redis():
+    """Shared Redis client from REDIS_URI, or None when not configured."""
+    global _redis_client
+    if redis is None or not os.getenv("REDIS_URI"):
+        return None
+    if _redis_client is None:
+        with _redis_lock:
+            if _redis_client is None:
+                _redis_client = redis.Redis.from_url(
+                    os.environ["REDIS_URI"], socket_timeout=0.5, socket_connect_timeout=0.5,
+                )
+    return _redis_client
+
+
+class TTLCache:
+    """Thread-safe mapping whose entries expire ``ttl`` seconds after insertion.
+
+    When more than ``maxsize`` entries are stored the least recently used one
+    is evicted.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 3600.0):
+        self.maxsize = maxsize
+        self.ttl     = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def ttl_cache(
+    maxsize: int = 4096,
+    ttl: float = 3600.0,
+    key: Callable[..., Hashable] | None = None,
+    shared: bool = False,
+    should_cache: Callable[[Any], bool] | None = None,
+) -> Callable:
+    """Decorator memoising a function's result in a :class:`TTLCache`.
+
+    ``key`` maps the call arguments to the cache key (defaults to the
+    positional arguments).  Results are deep-copied on the way out so callers
+    can mutate them freely.  The underlying cache is exposed as ``fn.cache``
+    and ``fn.cache_clear()`` empties both tiers.
+
+    ``should_cache(result)`` returning False keeps a result out of the cache,
+    e.g. error sentinels or no-data fallbacks that should be retried once
+    data arrives.
+
+    With ``shared=True`` and Redis configured, L1 misses fall through to a
+    Redis entry (JSON via orjson, same TTL) before calling the function.
+    Redis errors are ignored so an unavailable server only costs the L1 tier.
+
+    Concurrent misses on the same key are single-flighted: one caller runs
+    the function and the others wait for its result (or its exception).
+    """
+    def decorator(fn: Callable) -> Callable:
+        cache     = TTLCache(maxsize, ttl)
+        namespace = f"carintel:{fn.__module__}.{fn.__qualname__}"
+
+        def _l2_get(k: Hashable) -> Any:
+            r = _get_redis() if shared else None
+            if r is None:
+                return _MISSING
+            try:
+                raw = r.get(f"{namespace}:{orjson.dumps(k).decode()}")
+            except redis.RedisError:
+                return _MISSING
+            if raw is None:
+                return _MISSING
+            value = orjson.loads(raw)
+            # An entry written before a predicate existed is treated as a miss
+            if should_cache is not None and not should_cache(value):
+                return _MISSING
+            return value
+
+        def _l2_set(k: Hashable, value: Any) -> None:
+            r = _get_redis() if shared else None
+            if r is None:
+                return
+            try:
+                r.set(
+                    f"{namespace}:{orjson.dumps(k).decode()}",
+                    orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY),
+                    ex=int(ttl),
+                )
+            except (redis.RedisError, TypeError):
+                pass
+
+        inflight: dict[Hashable, Future] = {}
+        inflight_lock = threading.Lock()
+
+        def _load(k: Hashable, args: tuple, kwargs: dict) -> Any:
+            value = _l2_get(k)
+            if value is _MISSING:
+                value = fn(*args, **kwargs)
+                if should_cache is not None and not should_cache(value):
+                    return value          # kept out of both tiers
+                _l2_set(k, value)
+            cache.set(k, value)
+            return value
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            k = key(*args, **kwargs) if key else (args, tuple(sorted(kwargs.items())))
+            value = cache.get(k, _MISSING)
+            if value is not _MISSING:
+                return copy.deepcopy(value)
+
+            # Single-flight: concurrent misses on one key wait for the first
+            # caller's load instead of each running fn.
+            with inflight_lock:
+                fut = inflight.get(k)
+                leader = fut is None
+                if leader:
+                    fut = inflight[k] = Future()
+            if not leader:
+                return copy.deepcopy(fut.result())
+
+            try:
+                # A load that finished between the L1 miss and taking the slot
+                value = cache.get(k, _MISSING)
+                if value is _MISSING:
+                    value = _load(k, args, kwargs)
+                fut.set_result(value)
+            except BaseException as exc:
+                fut.set_exception(exc)
+                raise
+            finally:
+                with inflight_lock:
+                    inflight.pop(k, None)
+            return copy.deepcopy(value)
+
+        def cache_clear() -> None:
+            cache.clear()
+            r = _get_redis() if shared else None
+            if r is None:
+                return
+            try:
+                keys = list(r.scan_iter(match=f"{namespace}:*", count=1000))
+                if keys:
+                    r.delete(*keys)
+            except redis.RedisError:
+                pass
+
+        wrapper.cache       = cache
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
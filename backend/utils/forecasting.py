@@ -0,0 +1,87 @@
+# backend/utils/forecasting.py
+"""Closed-form trend + seasonal forecaster for short monthly price series."""
+from __future__ import annotations
+
+import numpy as np
+
+from backend.utils.jit import njit
+
+# Below a full year of data the sin/cos terms have nothing to anchor to and
+# only add variance, so the fit falls back to a straight trend line.
+_MIN_SEASONAL_POINTS = 12
+
+
+def _design(t: np.ndarray, month_of_year: np.ndarray, seasonal: bool) -> np.ndarray:
+    """float32 design matrix [1, t, sin, cos] with a calendar-aligned 12-month cycle."""
+    cols = [np.ones_like(t), t]
+    if seasonal:
+        phase = (2 * np.pi / 12) * month_of_year
+        cols += [np.sin(phase), np.cos(phase)]
+    return np.column_stack(cols).astype(np.float32, copy=False)
+
+
+@njit(cache=True)
+def _lstsq(X: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Least-squares coefficients (JIT-compiled when numba is available)."""
+    return np.linalg.lstsq(X, y, rcond=-1.0)[0]
+
+
+def ols_seasonal_forecast(
+    month_index: np.ndarray,
+    y: np.ndarray,
+    horizons: tuple[int, ...] = (1, 3),
+) -> tuple[np.ndarray, int]:
+    """Fit ``y ~ trend + yearly seasonality`` by least squares.
+
+    month_index : absolute month numbers (``year * 12 + month - 1``), so the
+                  seasonal terms line up with the calendar and gaps are kept.
+    horizons    : months ahead of the last observation to evaluate.
+
+    The solve runs in float32.  Time is measured from the last observation
+    and prices are centred on their mean first, so the values the solver
+    sees are small and float32's ~7 significant digits leave cent-level
+    precision for prices well past $200k.
+
+    Returns (forecasts for each horizon, month-of-year 1–12 of the highest
+    fitted value within the horizon window).
+    """
+    m = np.asarray(month_index, dtype=np.int64)
+    y = np.asarray(y, dtype=np.float64)
+    y_mean = y.mean()
+
+    m_last   = m[-1]
+    seasonal = len(m) >= _MIN_SEASONAL_POINTS
+    X = _design((m - m_last).astype(np.float32), (m % 12).astype(np.float32), seasonal)
+    beta = _lstsq(X, (y - y_mean).astype(np.float32))
+
+    ahead  = np.arange(1, max(horizons) + 1)
+    window = m_last + ahead
+    fitted = _design(ahead.astype(np.float32), (window % 12).astype(np.float32), seasonal) @ beta
+    fitted = fitted.astype(np.float64) + y_mean
+
+    forecasts = fitted[np.asarray(horizons) - 1]
+    peak_month = int(window[int(np.argmax(fitted))]) % 12 + 1
+    return forecasts, peak_month
+
+
+# ── Scalar kernels (JIT-compiled when numba is available) ─────────────────────
+
+@njit(cache=True)
+def extrapolate(last_price: float, mom_rate: float) -> tuple[float, float]:
+    """30/90-day prices from a constant month-over-month rate."""
+    return last_price * (1.0 + mom_rate), last_price * (1.0 + mom_rate * 3.0)
+
+
+@njit(cache=True)
+def blend_forecasts(
+    stat_30: float, stat_90: float, llm_30: float, llm_90: float,
+) -> tuple[float, float]:
+    """40/60 statistical/LLM blend at 30 days, 30/70 at 90 days."""
+    return 0.4 * stat_30 + 0.6 * llm_30, 0.3 * stat_90 + 0.7 * llm_90
+
+
+# Compile up front so the first request doesn't pay for it.
+extrapolate(1.0, 0.0)
+blend_forecasts(1.0, 1.0, 1.0, 1.0)
+ols_seasonal_forecast(np.arange(12), np.ones(12))
+ols_seasonal_forecast(np.arange(3), np.ones(3))
@@ -0,0 +1,15 @@
+# backend/utils/jit.py
+"""Optional Numba JIT — falls back to plain Python when numba is not installed."""
+from __future__ import annotations
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:                        # numba is an optional speed-up
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for ``numba.njit`` (bare or with options)."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
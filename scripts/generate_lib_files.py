@@ -0,0 +1,73 @@
+"""
+generate_lib_files.py
+Build the frontend's lib/car-catalog.ts from backend/car_catalog.py.
+
+Output shape (imported by app/page.tsx as CAR_CATALOG):
+  { make: { model: [year, ...newest first] } }
+
+The catalog is read as a Python literal with ast, so no regex scanning, and
+the tree is built from a single sort of the de-duplicated entries.
+
+Usage:
+  python scripts/generate_lib_files.py [--catalog PATH] [--out PATH]
+"""
+
+import argparse
+import ast
+from pathlib import Path
+
+import orjson
+
+_ROOT        = Path(__file__).parent.parent
+CATALOG_PATH = _ROOT / "backend" / "car_catalog.py"
+OUT_PATH     = _ROOT / "lib" / "car-catalog.ts"
+
+
+def load_catalog(path: Path = CATALOG_PATH) -> list[dict]:
+    """Return the CATALOG list literal from car_catalog.py without importing it."""
+    module = ast.parse(path.read_text(encoding="utf-8"))
+    for node in module.body:
+        if isinstance(node, ast.AnnAssign):
+            target, value = node.target, node.value
+        elif isinstance(node, ast.Assign) and len(node.targets) == 1:
+            target, value = node.targets[0], node.value
+        else:
+            continue
+        if isinstance(target, ast.Name) and target.id == "CATALOG":
+            return ast.literal_eval(value)
+    raise ValueError(f"No CATALOG assignment found in {path}")
+
+
+def build_tree(catalog: list[dict]) -> dict[str, dict[str, list[int]]]:
+    """Nest entries as make → model → years (newest first).
+
+    One sort of the flat (make, model, -year) keys puts every level in final
+    order, so dicts are built in insertion order and duplicate years are
+    adjacent — no per-level re-sort or set needed.
+    """
+    keys = sorted({(e["make"], e["model"], -int(e["year"])) for e in catalog})
+    tree: dict[str, dict[str, list[int]]] = {}
+    for make, model, neg_year in keys:
+        tree.setdefault(make, {}).setdefault(model, []).append(-neg_year)
+    return tree
+
+
+def main(catalog_path: Path = CATALOG_PATH, out_path: Path = OUT_PATH) -> None:
+    tree = build_tree(load_catalog(catalog_path))
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_bytes(
+        "// Auto-generated by scripts/generate_lib_files.py — do not edit by hand.\n".encode()
+        + b"export const CAR_CATALOG: Record<string, Record<string, number[]>> = "
+        + orjson.dumps(tree, option=orjson.OPT_INDENT_2)
+        + b";\n"
+    )
+    n_models = sum(len(models) for models in tree.values())
+    print(f"Wrote {out_path} — {len(tree)} makes, {n_models:,} models")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate lib/car-catalog.ts from car_catalog.py")
+    parser.add_argument("--catalog", type=Path, default=CATALOG_PATH, help="path to car_catalog.py")
+    parser.add_argument("--out",     type=Path, default=OUT_PATH,     help="output .ts file")
+    args = parser.parse_args()
+    main(args.catalog, args.out)
@@ -8,19 +8,47 @@ Imported by:
 
 Artefacts expected at:  car-price-intelligence/models/
   car_price_model.pkl
+  car_price_model.ubj    (native XGBoost export, written from the .pkl on first load)
   feature_meta.pkl
-  shap_data.pkl          (optional — built lazily if missing)
+  shap_data.pkl          (optional — global SHAP sample for /api/shap-importance;
+                          per-request SHAP values are computed from the model)
 """
 
 from __future__ import annotations
 
+import functools
+import math
+import os
+import threading
+
 import numpy as np
 import pandas as pd
 import joblib
 from pathlib import Path
 
+try:
+    import shap as _shap
+except ImportError:                        # only needed for the explain paths
+    _shap = None
+
+try:
+    import xgboost as xgb
+except ImportError:                        # a pickled non-XGBoost model still loads
+    xgb = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:                        # pyarrow is an optional speed-up
+    pa = pc = None
+
+from backend.utils.atomic import write_atomic
+from backend.utils.jit import njit
+
 # ── Paths ─────────────────────────────────────────────────────────────────────
 _MODELS_DIR = Path(__file__).parent.parent / "models"
+_MODEL_PKL  = _MODELS_DIR / "car_price_model.pkl"
+_MODEL_UBJ  = _MODELS_DIR / "car_price_model.ubj"
 
 LUXURY_MAKES = {
     "bmw", "mercedes-benz", "audi", "lexus", "porsche", "cadillac",
@@ -40,25 +68,212 @@ FEATURE_COLS = [
     "lat", "long",
 ]
 
+_FEATURE_INDEX = {name: i for i, name in enumerate(FEATURE_COLS)}
+
+# Threads per XGBoost predict call (XGB_PREDICT_THREADS overrides).
+_PREDICT_THREADS = int(os.getenv("XGB_PREDICT_THREADS", "1"))
+
 # ── Lazy-loaded singletons ────────────────────────────────────────────────────
 _model        = None
+_booster      = None       # XGBoost Booster behind _model, scored without the sklearn wrapper
+_iter_range   = (0, 0)     # trees the sklearn predict would use (best_iteration if early-stopped)
 _explainer    = None
 _feature_meta = None
+_cat_code_series: dict[str, pd.Series] = {}   # cat_codes as label-indexed Series
+# (column, feature slot, {normalised label: code} or None) for the single-row path
+_cat_slots: list[tuple[str, int, dict[str, int] | None]] = []
+
+_load_lock    = threading.Lock()
+
+
+def _load_model():
+    """
+    The regressor, from XGBoost's native UBJSON export when it is present and
+    not older than the pickle (smaller, and parsed without unpickling the
+    sklearn wrapper); otherwise unpickles the .pkl and writes that export for
+    the next start.
+    """
+    fresh = _MODEL_UBJ.exists() and (
+        not _MODEL_PKL.exists() or _MODEL_UBJ.stat().st_mtime >= _MODEL_PKL.stat().st_mtime
+    )
+    if fresh and xgb is not None:
+        try:
+            model = xgb.XGBRegressor()
+            model.load_model(_MODEL_UBJ)
+            return model
+        except Exception as exc:   # unreadable export — the pickle is the source of truth
+            print(f"[model_utils] native model load failed, using the pickle: {exc}")
+    model = joblib.load(_MODEL_PKL)
+    if hasattr(model, "save_model"):
+        try:
+            # Written aside and renamed in, so other workers never load a partial file
+            write_atomic(_MODEL_UBJ, model.save_model)
+        except Exception as exc:   # XGBoostError from the C++ stream on a read-only dir
+            print(f"[model_utils] native model export skipped, using the pickle: {exc}")
+    return model
 
 
 def _load_artifacts() -> None:
-    global _model, _explainer, _feature_meta
+    global _model, _booster, _iter_range, _explainer, _feature_meta, _cat_code_series, _cat_slots
     if _model is not None:
         return
-    _model        = joblib.load(_MODELS_DIR / "car_price_model.pkl")
-    _feature_meta = joblib.load(_MODELS_DIR / "feature_meta.pkl")
-    shap_path     = _MODELS_DIR / "shap_data.pkl"
-    if shap_path.exists():
-        shap_data  = joblib.load(shap_path)
-        _explainer = shap_data.get("explainer")
+    with _load_lock:
+        if _model is not None:
+            return
+        model = _load_model()
+        if not (hasattr(model, "get_booster") or hasattr(model, "booster_") or hasattr(model, "tree_")):
+            raise TypeError(f"{type(model).__name__} is not a tree model; TreeExplainer needs one")
+        _feature_meta = joblib.load(_MODELS_DIR / "feature_meta.pkl")
+        # Labels normalised the way inputs are, once, and shared by the batch
+        # (Series) and single-row (dict) encoders so both resolve identically
+        cat_codes = {
+            col: {str(label).lower().strip(): int(code) for label, code in codes.items()}
+            for col, codes in _feature_meta["cat_codes"].items()
+        }
+        _cat_code_series = {
+            col: pd.Series(codes, dtype=np.int64) for col, codes in cat_codes.items()
+        }
+        _cat_slots = [(col, _FEATURE_INDEX[col], cat_codes.get(col)) for col in CAT_COLS]
+        if hasattr(model, "get_booster"):
+            # Requests score one (or a handful of) rows; spinning up an OpenMP team
+            # per predict costs more than it saves and gets slower with more cores.
+            model.set_params(n_jobs=_PREDICT_THREADS)
+            _booster = model.get_booster()
+            _booster.set_param({"nthread": _PREDICT_THREADS})
+            try:
+                _iter_range = (0, model.best_iteration + 1)
+            except AttributeError:
+                _iter_range = (0, 0)
+        # XGBoost explains through pred_contribs (_booster_contribs); only other
+        # tree models need a TreeExplainer.  Always the exact tree-path
+        # algorithm, built here rather than unpickled from shap_data.pkl (whose
+        # explainer type isn't guaranteed).
+        if (_booster is None or xgb is None) and _shap is not None:
+            _explainer = _shap.TreeExplainer(model, feature_perturbation="tree_path_dependent")
+        _model = model                     # published last: marks loading complete
+
+
+def _get_explainer():
+    """SHAP TreeExplainer for the loaded model (built only for non-XGBoost models)."""
+    _load_artifacts()
+    if _explainer is None:
+        raise RuntimeError("shap is not installed; SHAP explanations are unavailable")
+    return _explainer
+
+
+_WARMUP_ROW = {"year": 2018, "odometer": 50_000, "make": "toyota", "model": "camry", "condition": "good"}
+_warm_lock  = threading.Lock()
+_warmed     = False
+
+
+def warmup() -> None:
+    """
+    Load the model and feature metadata (plus the SHAP explainer for
+    non-XGBoost models), then run one throwaway prediction and explanation
+    through both the single-row and batch paths so JIT compilation and
+    XGBoost's lazy predictor setup happen before the first request.
+    Bypasses the result caches; runs once.
+    """
+    global _warmed
+    if _warmed:
+        return
+    with _warm_lock:
+        if _warmed:
+            return
+        _load_artifacts()
+        x = _row_vector(_WARMUP_ROW)
+        _predict_X(x)
+        X, feature_names = _engineer_rows([_WARMUP_ROW, _WARMUP_ROW])
+        _predict_X(X)
+        if _explainer is not None or (_booster is not None and xgb is not None):
+            _top_shap(x, FEATURE_COLS)
+            _top_shap(X, feature_names)
+        _warmed = True
 
 
 # ── Feature engineering ───────────────────────────────────────────────────────
+def _clean_labels(uniques) -> np.ndarray:
+    """Lower-cased, whitespace-stripped string form of each distinct label
+    (one vectorised Arrow pass when pyarrow is installed)."""
+    labels = pd.Index(uniques, dtype=object).astype(str)
+    if pa is not None:
+        arr = pc.utf8_trim_whitespace(pc.utf8_lower(pa.array(labels, type=pa.string())))
+        return arr.to_numpy(zero_copy_only=False)
+    return labels.str.lower().str.strip().to_numpy()
+
+
+def _engineer_numeric(
+    df: pd.DataFrame, lat_median: float, long_median: float,
+) -> dict[str, np.ndarray]:
+    """
+    Continuous features and month as plain ndarrays (no index alignment).
+    Arithmetic runs in float64 and is cast to float32 at the end — XGBoost
+    scores in float32 anyway; handing it float32 (and int16 codes) halves the
+    bytes it has to read and convert.
+    """
+    n = len(df)
+
+    def numeric(col: str, fill: float) -> np.ndarray:
+        if col not in df.columns:
+            return np.full(n, fill)
+        return np.nan_to_num(pd.to_numeric(df[col], errors="coerce").to_numpy(np.float64), nan=fill)
+
+    # NaN years → 2014, i.e. the default car_age of 10
+    car_age  = np.clip(2024.0 - numeric("year", 2014.0), 0.0, 50.0)
+    odometer = numeric("odometer", 0.0)
+
+    if "month" in df.columns:
+        month = np.nan_to_num(df["month"].to_numpy(np.float64), nan=6.0).astype(np.int64)
+    elif "posting_date" in df.columns:
+        month = pd.to_datetime(df["posting_date"], errors="coerce", utc=True).dt.month.fillna(6).to_numpy(np.int64)
+    else:
+        month = np.full(n, 6, dtype=np.int64)
+
+    f32 = np.float32
+    return {
+        "car_age":          car_age.astype(f32),
+        "log_odometer":     np.log1p(odometer).astype(f32),
+        "mileage_per_year": (odometer / np.where(car_age == 0.0, 1.0, car_age)).astype(f32),
+        "month":            month,
+        "lat":              numeric("lat",  lat_median).astype(f32),
+        "long":             numeric("long", long_median).astype(f32),
+    }
+
+
+def _feature_columns(
+    df: pd.DataFrame, cat_codes: dict | None, lat_median: float, long_median: float,
+) -> dict[str, np.ndarray | np.generic]:
+    """Every FEATURE_COLS column as an ndarray (or a scalar for absent inputs)."""
+    out: dict[str, np.ndarray | np.generic] = _engineer_numeric(df, lat_median, long_median)
+    out["is_luxury"] = np.int8(0)           # set from the make labels below
+
+    for col in CAT_COLS:
+        if col not in df.columns:
+            out[col] = np.int16(-1)
+            continue
+        # Dictionary-encode first so the string cleanup and code lookup run
+        # once per distinct label, not per row.  Missing values factorize to
+        # -1, which indexes the trailing "unknown" label.
+        row_codes, uniques = pd.factorize(df[col])
+        labels = np.append(_clean_labels(uniques), "unknown")
+        if col == "make":
+            # Luxury test on the raw distinct labels (lower-cased, as before)
+            lux = [isinstance(u, str) and u.lower() in LUXURY_MAKES for u in uniques]
+            out["is_luxury"] = np.array(lux + [False], dtype=np.int8)[row_codes]
+        if cat_codes and col in cat_codes:
+            # Label-indexed Series (prebuilt in _load_artifacts); unseen → -1
+            mapping = cat_codes[col]
+            if not isinstance(mapping, pd.Series):
+                mapping = pd.Series(mapping, dtype=np.int64)
+            pos = mapping.index.get_indexer(labels)
+            code_dtype = np.int16 if len(mapping) < np.iinfo(np.int16).max else np.int32
+            out[col] = np.where(pos >= 0, mapping.to_numpy()[pos], -1).astype(code_dtype)[row_codes]
+        else:
+            out[col] = pd.Categorical(labels[row_codes]).codes
+
+    return out
+
+
 def engineer_features(
     df: pd.DataFrame,
     cat_codes: dict | None = None,
@@ -80,64 +295,204 @@ def engineer_features(
     X             : DataFrame of engineered features (model-ready)
     feature_names : Ordered list of column names matching X
     """
-    d = df.copy()
+    # Features are collected into a fresh frame, so the input is never copied
+    # or mutated.
+    out = _feature_columns(df, cat_codes, lat_median, long_median)
+    X = pd.DataFrame({c: out[c] for c in FEATURE_COLS}, index=df.index)
+    return X, list(FEATURE_COLS)
 
-    # Numeric coercion
-    for col in ("year", "odometer", "lat", "long"):
-        if col in d.columns:
-            d[col] = pd.to_numeric(d[col], errors="coerce")
 
-    d["car_age"]          = (2024 - d.get("year", 2014)).clip(0, 50).fillna(10)
-    d["log_odometer"]     = np.log1p(d.get("odometer", pd.Series(0, index=d.index)).fillna(0))
-    d["mileage_per_year"] = (
-        d.get("odometer", pd.Series(0, index=d.index)).fillna(0)
-        / d["car_age"].replace(0, 1)
+# ── Predict ───────────────────────────────────────────────────────────────────
+def _engineer_rows(rows: list[dict]) -> tuple[np.ndarray, list[str]]:
+    """
+    Feature matrix for raw listing dicts using the saved encodings, filled
+    column by column into one float32 array in FEATURE_COLS order — the
+    predict/explain paths never build the intermediate DataFrame.
+    """
+    _load_artifacts()
+    cols = _feature_columns(
+        pd.DataFrame(rows),
+        cat_codes   = _cat_code_series,
+        lat_median  = _feature_meta.get("lat_median",  37.0),
+        long_median = _feature_meta.get("long_median", -95.0),
+    )
+    X = np.empty((len(rows), len(FEATURE_COLS)), dtype=np.float32)
+    for i, col in enumerate(FEATURE_COLS):
+        X[:, i] = cols[col]
+    return X, FEATURE_COLS
+
+
+def _num(value) -> float:
+    """pd.to_numeric(errors="coerce") for one scalar."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+_I_CAR_AGE, _I_LOG_ODO, _I_MPY, _I_LUX, _I_MONTH, _I_LAT, _I_LONG = (
+    FEATURE_COLS.index(c)
+    for c in ("car_age", "log_odometer", "mileage_per_year", "is_luxury", "month", "lat", "long")
+)
+
+
+@njit(cache=True)
+def _fill_numeric(
+    out: np.ndarray, year: float, odometer: float, is_luxury: float, month: float,
+    lat: float, long: float, lat_median: float, long_median: float,
+) -> None:
+    """Numeric slots of one feature row (NaN inputs take engineer_features' fills)."""
+    if odometer != odometer:
+        odometer = 0.0
+    car_age = 10.0 if year != year else min(max(2024.0 - year, 0.0), 50.0)
+    out[_I_CAR_AGE] = car_age
+    out[_I_LOG_ODO] = np.log1p(odometer)
+    out[_I_MPY]     = odometer / (car_age if car_age != 0.0 else 1.0)
+    out[_I_LUX]     = is_luxury
+    out[_I_MONTH]   = month
+    out[_I_LAT]     = lat_median  if lat  != lat  else lat
+    out[_I_LONG]    = long_median if long != long else long
+
+
+def _row_vector(row: dict) -> np.ndarray:
+    """
+    engineer_features for a single listing dict, written straight into a
+    (1, n_features) float32 row — no DataFrame, same values and column order.
+    """
+    _load_artifacts()
+    x = np.empty((1, len(FEATURE_COLS)), dtype=np.float32)
+
+    month = row.get("month")
+    make  = row.get("make")
+    _fill_numeric(
+        x[0],
+        _num(row.get("year", 2014)),
+        _num(row.get("odometer")),
+        float(isinstance(make, str) and make.lower() in LUXURY_MAKES),
+        6.0 if month is None or month != month else float(int(month)),
+        _num(row.get("lat")),
+        _num(row.get("long")),
+        _feature_meta.get("lat_median",  37.0),
+        _feature_meta.get("long_median", -95.0),
     )
-    d["is_luxury"] = d.get("make", "").str.lower().isin(LUXURY_MAKES).astype(int)
 
-    if "month" in d.columns:
-        d["month"] = d["month"].fillna(6).astype(int)
-    elif "posting_date" in d.columns:
-        d["month"] = pd.to_datetime(d["posting_date"], errors="coerce", utc=True).dt.month.fillna(6).astype(int)
+    for col, i, codes in _cat_slots:
+        if col not in row:
+            x[0, i] = -1
+            continue
+        value = row[col]
+        label = "unknown" if value is None or value != value else str(value).lower().strip()
+        x[0, i] = codes.get(label, -1) if codes is not None else 0
+    return x
+
+
+def _single_row_ok(row: dict) -> bool:
+    """posting_date parsing is left to the pandas path."""
+    return "month" in row or "posting_date" not in row
+
+
+def _predict_X(X: pd.DataFrame | np.ndarray) -> list[float]:
+    X_np = np.ascontiguousarray(X, dtype=np.float32)
+    if _booster is not None:
+        log_price = _booster.inplace_predict(X_np, iteration_range=_iter_range)
     else:
-        d["month"] = 6
+        log_price = _model.predict(X_np)
+    return [float(p) for p in np.expm1(log_price)]
 
-    d["lat"]  = d.get("lat",  pd.Series(lat_median,  index=d.index)).fillna(lat_median)
-    d["long"] = d.get("long", pd.Series(long_median, index=d.index)).fillna(long_median)
 
-    for col in CAT_COLS:
-        if col not in d.columns:
-            d[col] = -1
-            continue
-        d[col] = d[col].fillna("unknown").astype(str).str.lower().str.strip()
-        if cat_codes and col in cat_codes:
-            d[col] = d[col].map(cat_codes[col]).fillna(-1).astype(int)
-        else:
-            d[col] = d[col].astype("category").cat.codes
+# Single-row results keyed on the engineered float32 row's bytes, so listings
+# that encode identically (unseen labels, case/whitespace variants) share an
+# entry.  ~8k entries of a few hundred bytes each.
+_ROW_CACHE_SIZE = 8192
 
-    available = [c for c in FEATURE_COLS if c in d.columns]
-    return d[available], available
+
+def _row_from_key(key: bytes) -> np.ndarray:
+    return np.frombuffer(key, dtype=np.float32).reshape(1, -1)
+
+
+@functools.lru_cache(maxsize=_ROW_CACHE_SIZE)
+def _cached_price(key: bytes) -> float:
+    return _predict_X(_row_from_key(key))[0]
+
+
+@functools.lru_cache(maxsize=_ROW_CACHE_SIZE)
+def _cached_factors(key: bytes) -> tuple[dict, ...]:
+    return tuple(_top_shap(_row_from_key(key), FEATURE_COLS)[0])
+
+
+def predict_prices(rows: list[dict]) -> list[float]:
+    """
+    Predict prices (original $) for many listing dicts in one model call.
+    Returns predicted prices in input order.
+    """
+    X, _ = _engineer_rows(rows)
+    return _predict_X(X)
 
 
-# ── Predict ───────────────────────────────────────────────────────────────────
 def predict_price(row_dict: dict) -> float:
     """
     Predict price (original $) for a single listing dict.
     Returns predicted price as a float.
     """
-    _load_artifacts()
-    df = pd.DataFrame([row_dict])
-    X, _ = engineer_features(
-        df,
-        cat_codes   = _feature_meta["cat_codes"],
-        lat_median  = _feature_meta.get("lat_median",  37.0),
-        long_median = _feature_meta.get("long_median", -95.0),
-    )
-    log_price = _model.predict(X)[0]
-    return float(np.expm1(log_price))
+    if _single_row_ok(row_dict):
+        return _cached_price(_row_vector(row_dict).tobytes())
+    return predict_prices([row_dict])[0]
 
 
 # ── Explain ───────────────────────────────────────────────────────────────────
+def _booster_contribs(X: pd.DataFrame | np.ndarray) -> np.ndarray:
+    """
+    Exact tree-path-dependent SHAP values from XGBoost's own TreeSHAP
+    (pred_contribs) — the same algorithm TreeExplainer runs, without its
+    per-call setup, and restricted to the scored iteration range.
+    """
+    dm = xgb.DMatrix(np.asarray(X, dtype=np.float32), feature_names=_booster.feature_names)
+    # Same trees as _predict_X, so the contributions add up to the price shown
+    contribs = _booster.predict(dm, pred_contribs=True, iteration_range=_iter_range)
+    return contribs[:, :-1]   # last column is the bias
+
+
+def _top_shap(X: pd.DataFrame | np.ndarray, feature_names: list[str], k: int = 3) -> list[list[dict]]:
+    """Top-k SHAP contributors for every row of X (one explainer call)."""
+    if _booster is not None and xgb is not None:
+        # Single rows and batches both go through pred_contribs: TreeExplainer
+        # would walk every tree, ignoring best_iteration, so a listing's factors
+        # would depend on whether it arrived alone or in a batch.
+        sv = _booster_contribs(X)
+    else:
+        # The additivity check re-runs a full model prediction just to assert on it
+        sv = np.asarray(_get_explainer().shap_values(X, check_additivity=False))
+    # sv shape: (n_rows, n_features)
+    vals = np.asarray(X)   # float32 matrix — values are rounded below to drop cast noise
+    mag  = np.abs(sv)
+    k    = min(k, mag.shape[1])
+    # Partial sort: pick each row's k largest, then order only those k
+    tops = np.argpartition(-mag, k - 1, axis=1)[:, :k]
+    tops = np.take_along_axis(tops, np.argsort(-np.take_along_axis(mag, tops, axis=1), axis=1), axis=1)
+
+    return [
+        [
+            {
+                "feature":   feature_names[i],
+                "value":     round(float(vals[r, i]), 4),
+                "impact":    round(float(abs(sv[r, i])), 4),
+                "direction": "increases price" if sv[r, i] > 0 else "decreases price",
+            }
+            for i in top
+        ]
+        for r, top in enumerate(tops)
+    ]
+
+
+def explain_predictions(rows: list[dict]) -> list[list[dict]]:
+    """
+    Top-3 SHAP contributors for many listings in one explainer call.
+    Returns one list per input row (see explain_prediction for the shape).
+    """
+    X, feature_names = _engineer_rows(rows)
+    return _top_shap(X, feature_names)
+
+
 def explain_prediction(row_dict: dict) -> list[dict]:
     """
     Return top-3 SHAP contributors for a single listing.
@@ -156,32 +511,18 @@ def explain_prediction(row_dict: dict) -> list[dict]:
           "direction": str,   # "increases price" | "decreases price"
         }
     """
-    import shap as _shap
-
-    _load_artifacts()
+    if _single_row_ok(row_dict):
+        return [dict(f) for f in _cached_factors(_row_vector(row_dict).tobytes())]
+    return explain_predictions([row_dict])[0]
 
-    df = pd.DataFrame([row_dict])
-    X, feature_names = engineer_features(
-        df,
-        cat_codes   = _feature_meta["cat_codes"],
-        lat_median  = _feature_meta.get("lat_median",  37.0),
-        long_median = _feature_meta.get("long_median", -95.0),
-    )
-
-    # Build explainer lazily if shap_data.pkl was not found
-    global _explainer
-    if _explainer is None:
-        _explainer = _shap.TreeExplainer(_model)
-
-    sv = _explainer.shap_values(X)[0]          # shape: (n_features,)
-    top3 = np.argsort(np.abs(sv))[::-1][:3]
 
-    return [
-        {
-            "feature":   feature_names[i],
-            "value":     float(X.iloc[0, i]),
-            "impact":    round(float(abs(sv[i])), 4),
-            "direction": "increases price" if sv[i] > 0 else "decreases price",
-        }
-        for i in top3
-    ]
+def predict_and_explain(rows: list[dict]) -> tuple[list[float], list[list[dict]]]:
+    """
+    Prices and top-3 SHAP factors for many listings, sharing one feature
+    build, one model call and one explainer call.
+    """
+    if len(rows) == 1 and _single_row_ok(rows[0]):
+        key = _row_vector(rows[0]).tobytes()
+        return [_cached_price(key)], [[dict(f) for f in _cached_factors(key)]]
+    X, feature_names = _engineer_rows(rows)
+    return _predict_X(X), _top_shap(X, feature_names)
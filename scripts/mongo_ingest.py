@@ -13,7 +13,7 @@ from pathlib import Path
 
 import pandas as pd
 from dotenv import load_dotenv
-from pymongo import MongoClient, ASCENDING
+from pymongo import MongoClient, ASCENDING, DESCENDING
 
 # ── Config ────────────────────────────────────────────────────────────────────
 load_dotenv()
@@ -107,10 +107,18 @@ def main() -> None:
     if snapshots:
         snapshots_col.insert_many(snapshots, ordered=False)
 
+    # Carries every field get_price_history projects → covered index scan
     snapshots_col.create_index(
         [("make", ASCENDING), ("model", ASCENDING),
-         ("year", ASCENDING), ("year_month", ASCENDING)],
-        name="make_model_year_month",
+         ("year", ASCENDING), ("year_month", ASCENDING),
+         ("avg_price", ASCENDING), ("median_price", ASCENDING),
+         ("listing_count", ASCENDING)],
+        name="make_model_year_month_covering",
+    )
+    # Market-wide fallback: most recent snapshots across all vehicles
+    snapshots_col.create_index(
+        [("year_month", DESCENDING), ("avg_price", ASCENDING)],
+        name="year_month_avg_price",
     )
     print(f"price_snapshots — inserted {snapshots_col.count_documents({}):,} docs")
 
@@ -128,6 +136,26 @@ def main() -> None:
     for name in ["listings", "price_snapshots", "predictions_cache"]:
         print(f"  {name:<22} {db[name].count_documents({}):>8,}")
 
+    # ── 4b. Index check — the price-history query should be fully covered ────
+    sample = snapshots_col.find_one({}, {"_id": 0, "make": 1, "model": 1, "year": 1})
+    if sample:
+        plan = db.command(
+            "explain",
+            {
+                "find":       "price_snapshots",
+                "filter":     sample,
+                "projection": {"_id": 0, "year_month": 1, "avg_price": 1,
+                               "median_price": 1, "listing_count": 1},
+                "sort":       {"year_month": 1},
+            },
+            verbosity="executionStats",
+        )["executionStats"]
+        covered = plan["totalDocsExamined"] == 0
+        print(f"\n=== Index check (price history for {sample}) ===")
+        print(f"  keys examined: {plan['totalKeysExamined']}  docs examined: "
+              f"{plan['totalDocsExamined']}  returned: {plan['nReturned']}  "
+              f"→ {'covered' if covered else 'NOT covered — check price_snapshots indexes'}")
+
     # ── 5. Storage usage (M0 quota check) ────────────────────────────────────
     stats = db.command("dbStats", scale=1_048_576)   # scale to MB
     used_mb  = stats.get("dataSize", 0) + stats.get("indexSize", 0)